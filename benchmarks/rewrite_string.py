@@ -0,0 +1,33 @@
+# Micro-benchmark of the escape decoder used for string literals and READ,
+# decoding time has to grow linearly with the length of the line.
+# Usage: python3 benchmarks/rewrite_string.py
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from interpret import rewrite_string
+
+# Function to build a line of roughly the given size made almost only of escape sequences
+def make_line(size):
+    chunk = "a\\032b\\092&lt;c&amp;\\010"
+    return chunk * (size // len(chunk))
+
+# Function to return the best time of a few runs of rewrite_string over the line
+def measure(line, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rewrite_string(line)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+if __name__ == "__main__":
+    base = None
+    for megabytes in [1, 2, 4, 8]:
+        line = make_line(megabytes * 1024 * 1024)
+        elapsed = measure(line)
+        if base is None:
+            base = elapsed
+        print("{:>2} MB line: {:8.4f} s  ({:.2f}x the 1 MB time)".format(megabytes, elapsed, elapsed / base))
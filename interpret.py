@@ -2,12 +2,265 @@ import sys
 import xml.etree.ElementTree as ET
 import os
 import re
+import mmap
+import hashlib
+import pickle
+import struct
+import operator
+from enum import IntEnum
+# Superinstructions the peephole optimizer fuses common sequences into, a source program cannot use them
+SUPERINSTRUCTIONS = ("PUSH_ADD_POP", "PUSH_SUB_POP", "PUSH_MUL_POP", "PUSH_IDIV_POP", "MOVE_JUMPIFEQ", "MOVE_JUMPIFNEQ")
+# Variants without runtime checks of instructions whose operands were proven to have values of the right types,
+# each variant is mapped to the instruction it replaces
+TYPED_INSTRUCTIONS = {"ADD_INT": "ADD", "SUB_INT": "SUB", "MUL_INT": "MUL", "IDIV_INT": "IDIV", "LT_TYPED": "LT", "GT_TYPED": "GT",
+                      "EQ_TYPED": "EQ", "CONCAT_STRING": "CONCAT", "JUMPIFEQ_TYPED": "JUMPIFEQ", "JUMPIFNEQ_TYPED": "JUMPIFNEQ"}
+# All opcodes of IPPcode23 followed by the opcodes only the optimizer creates, the id of an opcode is its index in this tuple
+OPCODES = ("CREATEFRAME", "PUSHFRAME", "POPFRAME", "RETURN", "BREAK", "CLEARS", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS", "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS","DEFVAR", "POPS","CALL", "LABEL", "JUMP", "JUMPIFEQS", "JUMPIFNEQS", "PUSHS", "WRITE", "EXIT", "DPRINT","MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE", "READ","ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR", "JUMPIFEQ", "JUMPIFNEQ") + SUPERINSTRUCTIONS + tuple(TYPED_INSTRUCTIONS)
+OPCODE_IDS = {opcode: index for index, opcode in enumerate(OPCODES)}
+# Opcodes whose first argument is a label, it is replaced by the index of the label in the program array
+JUMP_OPCODES = ("CALL", "JUMP", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS", "MOVE_JUMPIFEQ", "MOVE_JUMPIFNEQ", "JUMPIFEQ_TYPED", "JUMPIFNEQ_TYPED")
+# Operands of every opcode, v is a variable, s a variable or constant, t a jump target, l a label name and y a type
+OPERANDS = {name: operands for names, operands in [
+    (("CREATEFRAME", "PUSHFRAME", "POPFRAME", "RETURN", "BREAK", "CLEARS", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS",
+      "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS"), ""),
+    (("DEFVAR", "POPS"), "v"),
+    (("CALL", "JUMP", "JUMPIFEQS", "JUMPIFNEQS"), "t"),
+    (("LABEL",), "l"),
+    (("PUSHS", "WRITE", "EXIT", "DPRINT"), "s"),
+    (("MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE"), "vs"),
+    (("READ",), "vy"),
+    (("ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR",
+      "PUSH_ADD_POP", "PUSH_SUB_POP", "PUSH_MUL_POP", "PUSH_IDIV_POP"), "vss"),
+    (("JUMPIFEQ", "JUMPIFNEQ"), "tss"),
+    (("MOVE_JUMPIFEQ", "MOVE_JUMPIFNEQ"), "tvsss")] for name in names}
+OPERANDS.update({variant: OPERANDS[base] for variant, base in TYPED_INSTRUCTIONS.items()})
+# Type attributes of XML arguments allowed for each letter of OPERANDS
+OPERAND_TYPES = {"v": ("var",), "s": ("var", "int", "bool", "string", "nil"), "t": ("label",), "l": ("label",), "y": ("type",)}
+# Type tags of IPPcode23 values
+class Type(IntEnum):
+    NIL = 0
+    INT = 1
+    BOOL = 2
+    STRING = 3
+# Module level aliases of the type tags, looking a member up on the enum class is slow
+NIL, INT, BOOL, STRING = Type.NIL, Type.INT, Type.BOOL, Type.STRING
+# Values are (type, value) tuples holding Python ints, bools and strings, nil and the bools are shared singletons
+NIL_VALUE = (NIL, None)
+TRUE = (BOOL, True)
+FALSE = (BOOL, False)
+# Number of nested CALLs a program may make unless --max-call-depth gives another limit,
+# a CALL beyond the limit exits with CALL_DEPTH_EXIT_CODE
+DEFAULT_MAX_CALL_DEPTH = 1000000
+CALL_DEPTH_EXIT_CODE = 99
+# Value of a variable that is defined but was not assigned yet
+UNINITIALIZED = (None, None)
+# Length from which CONCAT returns a Rope instead of copying both strings into a new one
+ROPE_MIN_LENGTH = 1024
+# Base of the string values that are not a str, the characters are read through the str the subclass makes
+# with __str__, which a subclass caches, so a value is joined at most once until it changes
+class LazyString:
+    __slots__ = ()
+    def __len__(self):
+        return len(str(self))
+    def __getitem__(self, index):
+        return str(self)[index]
+    def __iter__(self):
+        return iter(str(self))
+    def __hash__(self):
+        return hash(str(self))
+    def __eq__(self, other):
+        return str(self) == str(other)
+    def __ne__(self, other):
+        return str(self) != str(other)
+    def __lt__(self, other):
+        return str(self) < str(other)
+    def __gt__(self, other):
+        return str(self) > str(other)
+    def __le__(self, other):
+        return str(self) <= str(other)
+    def __ge__(self, other):
+        return str(self) >= str(other)
+    def __repr__(self):
+        return repr(str(self))
+# String value built by CONCAT, it is the first count pieces of a list that ropes share and only ever append to,
+# so appending to the newest rope of a list is amortized O(1) and every older rope still sees its own pieces,
+# the pieces are joined into a str the first time it is needed, its length is known without joining
+class Rope(LazyString):
+    __slots__ = ("pieces", "count", "length", "text")
+    def __init__(self, pieces, length):
+        self.pieces = pieces
+        self.count = len(pieces)
+        self.length = length
+        self.text = None
+    # Method to return the rope with a string appended
+    def append(self, string):
+        if self.count == len(self.pieces):
+            self.pieces.append(string)
+            return Rope(self.pieces, self.length + len(string))
+        return Rope(self.pieces[:self.count] + [string], self.length + len(string))
+    def __str__(self):
+        if self.text is None:
+            self.text = "".join(self.pieces[:self.count])
+        return self.text
+    def __len__(self):
+        return self.length
+# String value of a variable that SETCHAR changed, a list of its characters that SETCHAR and GETCHAR index in O(1),
+# unlike the other values it is mutable, so only the variable holds it and MOVE and PUSHS store a str copy
+class StringBuffer(LazyString):
+    __slots__ = ("chars", "text")
+    def __init__(self, string):
+        self.chars = list(string)
+        self.text = string
+    def __setitem__(self, index, char):
+        self.chars[index] = char
+        self.text = None
+    def __str__(self):
+        if self.text is None:
+            self.text = "".join(self.chars)
+        return self.text
+    def __len__(self):
+        return len(self.chars)
+    def __getitem__(self, index):
+        return self.chars[index]
+# Function to concatenate two strings of CONCAT, long results are ropes, so a loop appending to one variable is linear
+def concat(string1, string2):
+    if type(string2) is not str:
+        string2 = str(string2)
+    if type(string1) is not str:
+        if type(string1) is Rope:
+            return string1.append(string2)
+        string1 = str(string1)
+    if len(string1) + len(string2) < ROPE_MIN_LENGTH:
+        return string1 + string2
+    return Rope([string1, string2], len(string1) + len(string2))
+# Error of an instruction with the exit code it ends the program with, the loader reports it once the whole
+# source was read, the interpreters exit with it and the constant folder leaves the instruction to fail when the program runs
+class InstructionError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+# Functions computing the values of the instructions, shared by the handlers of the interpreters and the constant
+# folder, their operands are (type, value) values of initialized variables or constants
+# Function to return the values of the two operands of an arithmetic instruction
+def int_values(symb1, symb2):
+    if symb1[0] is not INT or symb2[0] is not INT:
+        raise InstructionError(53)
+    return symb1[1], symb2[1]
+def add(symb1, symb2):
+    value1, value2 = int_values(symb1, symb2)
+    return (INT, value1 + value2)
+def sub(symb1, symb2):
+    value1, value2 = int_values(symb1, symb2)
+    return (INT, value1 - value2)
+def mul(symb1, symb2):
+    value1, value2 = int_values(symb1, symb2)
+    return (INT, value1 * value2)
+def idiv(symb1, symb2):
+    value1, value2 = int_values(symb1, symb2)
+    if value2 == 0:
+        raise InstructionError(57)
+    return (INT, value1 // value2)
+# Function to return the values of the two operands of a relational instruction, they have the same type other than nil
+def comparable_values(symb1, symb2):
+    if symb1[0] is not symb2[0] or symb1[0] is NIL:
+        raise InstructionError(53)
+    return symb1[1], symb2[1]
+def lt(symb1, symb2):
+    value1, value2 = comparable_values(symb1, symb2)
+    return TRUE if value1 < value2 else FALSE
+def gt(symb1, symb2):
+    value1, value2 = comparable_values(symb1, symb2)
+    return TRUE if value1 > value2 else FALSE
+# Function to compare two values for EQ and the conditional jumps, nil may be compared with any type
+def values_equal(symb1, symb2):
+    if symb1[0] is not symb2[0]:
+        if symb1[0] is not NIL and symb2[0] is not NIL:
+            raise InstructionError(53)
+        return False
+    return symb1[1] == symb2[1]
+def eq(symb1, symb2):
+    return TRUE if values_equal(symb1, symb2) else FALSE
+# Function to return the values of the two operands of a logical instruction
+def bool_values(symb1, symb2):
+    if symb1[0] is not BOOL or symb2[0] is not BOOL:
+        raise InstructionError(53)
+    return symb1[1], symb2[1]
+def logical_and(symb1, symb2):
+    value1, value2 = bool_values(symb1, symb2)
+    return TRUE if value1 and value2 else FALSE
+def logical_or(symb1, symb2):
+    value1, value2 = bool_values(symb1, symb2)
+    return TRUE if value1 or value2 else FALSE
+def logical_not(symb):
+    if symb[0] is not BOOL:
+        raise InstructionError(53)
+    return FALSE if symb[1] else TRUE
+def int2char(symb):
+    if symb[0] is not INT:
+        raise InstructionError(53)
+    try:
+        return (STRING, chr(symb[1]))
+    except (ValueError, OverflowError):
+        raise InstructionError(58)
+def stri2int(symb1, symb2):
+    if symb1[0] is not STRING or symb2[0] is not INT:
+        raise InstructionError(53)
+    index = symb2[1]
+    if index >= len(symb1[1]) or index < 0:
+        raise InstructionError(58)
+    return (INT, ord(symb1[1][index]))
+def concat_strings(symb1, symb2):
+    if symb1[0] is not STRING or symb2[0] is not STRING:
+        raise InstructionError(53)
+    return (STRING, concat(symb1[1], symb2[1]))
+def strlen(symb):
+    if symb[0] is not STRING:
+        raise InstructionError(53)
+    return (INT, len(symb[1]))
+def getchar(symb1, symb2):
+    if symb1[0] is not STRING or symb2[0] is not INT:
+        raise InstructionError(53)
+    index = symb2[1]
+    if index >= len(symb1[1]) or index < 0:
+        raise InstructionError(58)
+    return (STRING, symb1[1][index])
+# Function to return the name TYPE gives a value, a variable without a value has the empty name
+def type_name(symb):
+    return (STRING, "" if symb[0] is None else symb[0].name.lower())
+# Functions of the instructions computing a value from their symbols, by opcode
+OPERATIONS = {"ADD": add, "SUB": sub, "MUL": mul, "IDIV": idiv, "LT": lt, "GT": gt, "EQ": eq, "AND": logical_and, "OR": logical_or,
+              "NOT": logical_not, "INT2CHAR": int2char, "STRI2INT": stri2int, "CONCAT": concat_strings, "STRLEN": strlen,
+              "GETCHAR": getchar, "TYPE": type_name}
+# Types that READ accepts as its second argument
+READ_TYPES = {"int": INT, "bool": BOOL, "string": STRING}
+# Pattern matching one HTML entity or \ddd escape sequence of a string
+ESCAPE_PATTERN = re.compile(r'&(?:lt|gt|amp|quot|apos);|\\\d{3}')
+ENTITIES = {"&lt;": "<", "&gt;": ">", "&amp;": "&", "&quot;": '"', "&apos;": "'"}
+# Function returning the symbol of one escape sequence matched by ESCAPE_PATTERN
+def escape_replacement(match):
+    text = match.group()
+    if text[0] == "\\":
+        return chr(int(text[1:]))
+    return ENTITIES[text]
+# Function to convert HTML entities and \ddd escape sequences of a string to their corresponding symbols,
+# it is a single left to right pass, so decoded characters are never decoded again
+def rewrite_string(string):
+    if "\\" not in string and "&" not in string:
+        return string
+    return ESCAPE_PATTERN.sub(escape_replacement, string)
 class Args:
     def __init__(self):
         # Initialize all arguments to None or False
         self.soursefile = None
         self.inputfile = None
         self.statsOutputFile = None
+        self.cacheDir = None
+        self.compileFile = None
+        self.backend = "interpret"
+        self.dumpPythonFile = None
+        self.optimize = False
+        self.deadCodeReportFile = None
+        self.maxCallDepth = DEFAULT_MAX_CALL_DEPTH
         self.insts = False
         self.vars = False
         self.hot = False
@@ -50,6 +303,27 @@ class Args:
                 self.inputBool = True
             elif sys.argv[i] == "--stats" and i+2 < len(sys.argv) and sys.argv[0] != sys.argv[i+2]:
                 self.statsOutputFile = sys.argv[i+2]
+            elif sys.argv[i] == "--cache" and i+2 < len(sys.argv) and self.cacheDir == None:
+                self.cacheDir = sys.argv[i+2]
+            elif sys.argv[i] == "--compile" and i+2 < len(sys.argv) and self.compileFile == None:
+                self.compileFile = sys.argv[i+2]
+            elif sys.argv[i] == "--dump-python" and i+2 < len(sys.argv) and self.dumpPythonFile == None:
+                self.dumpPythonFile = sys.argv[i+2]
+            elif sys.argv[i] == "--dead-code-report" and i+2 < len(sys.argv) and self.deadCodeReportFile == None:
+                self.deadCodeReportFile = sys.argv[i+2]
+            elif sys.argv[i] == "--max-call-depth" and i+2 < len(sys.argv):
+                try:
+                    self.maxCallDepth = int(sys.argv[i+2])
+                except ValueError:
+                    exit(10)
+                if self.maxCallDepth < 1:
+                    exit(10)
+            elif sys.argv[i] == "--optimize":
+                self.optimize = True
+            elif sys.argv[i] == "--backend" and i+2 < len(sys.argv):
+                if sys.argv[i+2] not in BACKENDS:
+                    exit(10)
+                self.backend = sys.argv[i+2]
     # Method to check program arguments for correctness
     def CheckProgramArguments(self):
         # If both sourcefile and inputfile are None, exit program
@@ -84,1752 +358,1995 @@ class Args:
         print(" --help print out basic info about this script\n")
         print(" --source=file specify input file with XML representation of source code\n")
         print(" --input=file specify input file for interpretation of source code\n")
+        print(" --compile=file write the program to file as bytecode instead of running it, --source accepts such files\n")
+        print(" --backend=name run the program with the reference interpreter (interpret), compiled to closures (closures)")
+        print("                or translated to Python source (python)\n")
+        print(" --dump-python=file write the Python source the python backend generates for the program to file instead of running it\n")
+        print(" --optimize run the optimization passes over the loaded program, --stats=file receives how often each rule fired\n")
+        print(" --dead-code-report=file with --optimize, list the unreachable blocks that were removed in file\n")
+        print(" --max-call-depth=n allow at most n nested CALLs, a deeper CALL exits with {} (default {})\n".format(CALL_DEPTH_EXIT_CODE, DEFAULT_MAX_CALL_DEPTH))
+        print(" --cache=dir keep validated programs in dir and reuse them while the source file is unchanged\n")
         exit(0)
 class ProgramXMLReader:
-    def __init__(self, sourcefile):
-        # Initialize instance variables
+    def __init__(self, sourcefile, chunk_size=65536):
+        # Initialize instance variables, the source is read only when the program is loaded
+        self._sourcefile = sourcefile
+        self._chunk_size = chunk_size
+        self._exit_code = None
         self._root = None
-        self._tree = None
-        self._instruction_order = 0
-         # If sourcefile is provided, parse the file. Otherwise, parse standard input
-        if sourcefile:
-            self._parse_file(sourcefile)
+        self._depth = 0
+    def execute_program(self, builder):
+        # Load the program into the builder and exit with the first error found in it
+        if self._sourcefile and self._sourcefile is not sys.stdin:
+            self._parse_file(self._sourcefile, builder)
         else:
-            self._parse_stdin()
-    def _parse_file(self, sourcefile):
-        # Parse XML file
+            self._parse_stdin(builder)
+        if self._exit_code is not None:
+            exit(self._exit_code)
+        builder.finish()
+    def _parse_file(self, sourcefile, builder):
+        # Stream the XML file, so the whole document is never held in memory
         try:
-            self._tree = ET.parse(sourcefile)
+            self._read_events(ET.iterparse(sourcefile, events=("start", "end")), builder)
         except ET.ParseError:
             # If there's a parsing error, exit with code 31
             exit(31)
-        # Get root element of the XML tree
-        self._root = self._tree.getroot()
-    def _parse_stdin(self):
-        # Parse XML from standard input
+    def _parse_stdin(self, builder):
+        # Feed the whole standard input to an incremental parser chunk by chunk
+        parser = ET.XMLPullParser(events=("start", "end"))
         try:
-            tree = input()
-            self._root = ET.fromstring(tree)
-        except:
-            # If there's an error, exit with code 31
+            while True:
+                chunk = sys.stdin.buffer.read(self._chunk_size)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                self._read_events(parser.read_events(), builder)
+            parser.close()
+            self._read_events(parser.read_events(), builder)
+        except ET.ParseError:
+            # If there's a parsing error or the input is empty, exit with code 31
             exit(31)
-    def execute_program(self):
-        # Check the structure of the XML tree and order the instructions
-        self._check_structure_of_xml_tree()
-        self._order_instructions()
-    def _check_structure_of_xml_tree(self):
-        # Check the structure of the XML tree
-        for ins in self._root:
-            if ins.tag != 'instruction':
-                exit(32)
-            if not ins.attrib.get('opcode') or not ins.attrib.get('order'):
-                exit(32)
-            for arg in ins:
-                if arg.tag not in ['arg1', 'arg2', 'arg3'] or not arg.attrib.get('type'):
-                    exit(32)
-        if self._root.tag != 'program' or self._root.attrib.get('language').upper() != 'IPPCODE23':
-            exit(32)
-        for atrb in self._root.attrib:
-            if(atrb not in ["name", "description"]):
-                exit(32)
-    def _order_instructions(self):
-        # Order the instructions based on their order attribute
+    def _read_events(self, events, builder):
+        # Every instruction is passed to the builder as soon as it is complete and cleared from the tree
+        for event, element in events:
+            if event == "start":
+                self._depth += 1
+                if self._depth == 1:
+                    self._root = element
+                    self._check_program_element(element)
+                continue
+            self._depth -= 1
+            if self._depth == 1:
+                self._add_instruction(element, builder)
+                self._root.clear()
+    def _check_program_element(self, root):
+        # Check the root element and its attributes
+        if root.tag != 'program' or (root.attrib.get('language') or '').upper() != 'IPPCODE23':
+            self._error(32)
+        for atrb in root.attrib:
+            if(atrb not in ["language", "name", "description"]):
+                self._error(32)
+    def _add_instruction(self, ins, builder):
+        # Check the structure of one instruction element and pass it to the builder
+        if ins.tag != 'instruction':
+            self._error(32)
+        elif not ins.attrib.get('opcode') or not ins.attrib.get('order'):
+            self._error(32)
+        elif any(arg.tag not in ['arg1', 'arg2', 'arg3'] or not arg.attrib.get('type') for arg in ins):
+            self._error(32)
+        if self._exit_code is not None:
+            return
         try:
-            instructions = self._root.findall('instruction')
-            instructions.sort(key=lambda instruction: int(instruction.get('order')))
-            for instruction in instructions:
-                if self._check_instruction_order(instruction.get('order')):
-                    if instruction.get('order') in self._instruction_order:
-                        exit(32)
-                    self._instruction_order = int(instruction.get('order').upper())
-            if len(instructions) != len(set(instructions)):
-                exit(32)
-        except:
-            exit(32)
-    def _check_instruction_order(self, external_order):
-        # Check that the order of the instruction is valid
-        if external_order is None:
-            exit(32)
-        try:
-            control_var = int(external_order)
-        except ValueError:
-            exit(32)
-        return self._instruction_order < control_var
+            builder.add_instruction(ins)
+        except InstructionError as error:
+            self._error(error.code)
+    def _error(self, code):
+        # Remember the first error, the rest of the document is still read so a malformed XML exits with 31
+        if self._exit_code is None:
+            self._exit_code = code
 class Instructions:
-    def __init__(self, xmlinstr):
-        self.xmlinst = xmlinstr # initializes the xmlinstr attribute
+    def __init__(self):
         self.opcode = None
         self.instr = None
-        self.instr_dict = {}
+        self.program = []
+        # order numbers of the instructions in the source, indexed like the program array
+        self.orders = []
         self.label_dict = {}
         self.order_dict = {}
-        for instr in xmlinstr:
-             # extracts the opcode and order number of each instruction from xmlinstr
-            self.opcode = instr.attrib["opcode"].upper()
-            self.order = instr.attrib["opcode"]
+        # slot numbers of global variables and their names indexed by slot
+        self.global_slots = {}
+        self.global_names = []
+    # converts one instruction element into a compact (opcode, args, types) record
+    def add_instruction(self, instr):
+        # extracts the opcode and order number of the instruction
+        self.opcode = instr.attrib["opcode"].upper()
+        try:
             order = int(instr.attrib["order"])
-            # checks if the order number is greater than zero, if not, exits with code 32
-            if int(order) <=  0 :
-                exit(32)
-            # checks if the opcode is valid, if not, exits with code 32
-            if self.opcode not in ["CREATEFRAME", "PUSHFRAME", "POPFRAME", "RETURN", "BREAK", "CLEARS", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS", "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS","DEFVAR", "POPS","CALL", "LABEL", "JUMP", "JUMPIFEQS", "JUMPIFNEQS", "PUSHS", "WRITE", "EXIT", "DPRINT","MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE", "READ","ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR", "JUMPIFEQ", "JUMPIFNEQ"]:
-                exit(32)
-            # adds the instruction to instr_dict attribute with order number as key
-            self.instr_dict[str(order)] = {
-                "opcode": self.opcode,
-                "args": [arg.text for arg in instr],
-                "type": [arg.attrib['type'] for arg in instr]
-            }
-            self.args = [arg.text for arg in instr]
-            self.types = [arg.attrib['type'] for arg in instr]
-            # if the opcode is LABEL, adds the label to label_dict attribute with label name as key and order number minus 1 as value
-            if self.opcode == "LABEL":
-                if self.args[0] in self.label_dict:
-                    exit(52)
+        except ValueError:
+            raise InstructionError(32)
+        # checks if the order number is greater than zero and unique, if not, exits with code 32
+        if order <= 0 or order in self.order_dict:
+            raise InstructionError(32)
+        # checks if the opcode is valid, if not, exits with code 32
+        if self.opcode not in OPCODE_IDS or self.opcode in SUPERINSTRUCTIONS or self.opcode in TYPED_INSTRUCTIONS:
+            raise InstructionError(32)
+        self.args = [arg.text for arg in instr]
+        self.types = [arg.attrib['type'] for arg in instr]
+        self.check_num_of_args()
+        self.check_instr_args()
+        self.resolve_operands()
+        # remembers the instruction under its order number, the program array is built once all are known
+        self.order_dict[order] = (OPCODE_IDS[self.opcode], self.args, self.types)
+    # lays the instructions out in a dense array sorted by their order numbers once the whole program was read
+    def finish(self):
+        for order in sorted(self.order_dict):
+            self.program.append(self.order_dict[order])
+            self.orders.append(order)
+        self.order_dict = {}
+        self.resolve_labels()
+    # splits variable operands into (frame, name) pairs once, so the interpreter never has to split strings,
+    # global variables get (frame, slot) pairs with slots numbered in order of appearance,
+    # literals are converted to (type, value) values
+    def resolve_operands(self):
+        for i in range(len(self.args)):
+            if self.types[i] == "var":
+                if self.args[i] is None:
+                    raise InstructionError(32)
+                frame, _, name = self.args[i].partition("@")
+                if frame not in ["GF", "LF", "TF"] or not name:
+                    raise InstructionError(32)
+                if frame == "GF":
+                    if name not in self.global_slots:
+                        self.global_slots[name] = len(self.global_names)
+                        self.global_names.append(name)
+                    self.args[i] = (frame, self.global_slots[name])
                 else:
-                    self.label_dict[self.args[0]] = int(order) - 1
-            self.check_num_of_args()
-            self.check_instr_args()
+                    self.args[i] = (frame, name)
+            elif self.types[i] == "string":
+                # an empty string literal has no text in the XML, escape sequences are decoded only here
+                self.args[i] = (STRING, rewrite_string(self.args[i] or ""))
+            elif self.types[i] == "int":
+                try:
+                    self.args[i] = (INT, int(self.args[i]))
+                except (TypeError, ValueError):
+                    raise InstructionError(32)
+            elif self.types[i] == "bool":
+                if self.args[i] not in ["true", "false"]:
+                    raise InstructionError(32)
+                self.args[i] = TRUE if self.args[i] == "true" else FALSE
+            elif self.types[i] == "nil":
+                if self.args[i] != "nil":
+                    raise InstructionError(32)
+                self.args[i] = NIL_VALUE
+            elif self.types[i] == "type":
+                if self.args[i] not in READ_TYPES:
+                    raise InstructionError(32)
+                self.args[i] = READ_TYPES[self.args[i]]
+    # maps every label to the index of its LABEL instruction and replaces label operands with those indexes
+    def resolve_labels(self):
+        for index, (opcode, args, types) in enumerate(self.program):
+            if opcode == OPCODE_IDS["LABEL"]:
+                if args[0] in self.label_dict:
+                    exit(52)
+                self.label_dict[args[0]] = index
+        for opcode, args, types in self.program:
+            if OPCODES[opcode] in JUMP_OPCODES:
+                if args[0] not in self.label_dict:
+                    exit(52)
+                args[0] = self.label_dict[args[0]]
     # checks if the number of arguments for the instruction is valid
     def check_num_of_args(self):
-        if self.opcode in ["CREATEFRAME", "PUSHFRAME", "POPFRAME", "RETURN", "BREAK", "CLEARS", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS", "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS"] and len(self.args) != 0:
-            exit(32)
-        elif self.opcode in ["DEFVAR", "POPS","CALL", "LABEL", "JUMP", "JUMPIFEQS", "JUMPIFNEQS", "PUSHS", "WRITE", "EXIT", "DPRINT"] and len(self.args) != 1:
-            exit(32)
-        elif self.opcode in ["MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE", "READ"] and len(self.args) != 2:
-            exit(32)
-        elif self.opcode in ["ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR", "JUMPIFEQ", "JUMPIFNEQ"] and len(self.args) != 3:
-            exit(32)
-     # checks if the type of arguments for the instruction is valid
+        if len(self.args) != len(OPERANDS[self.opcode]):
+            raise InstructionError(32)
+    # checks if the type of every argument is one the instruction accepts at its position, so the handlers
+    # only ever see variables and (type, value) constants where they read a symbol
     def check_instr_args(self):
-        if self.opcode in ["DEFVAR", "POPS"] and self.types[0] != "var":
-                exit(53)
-        elif self.opcode in ["CALL", "LABEL", "JUMP", "JUMPIFEQS", "JUMPIFNEQS"] and self.types[0] != "label":
-                exit(53)
-        elif self.opcode in ["PUSHS", "WRITE", "EXIT", "DPRINT"]:
-            if self.types[0] != "string" and self.types[0] != "bool" and self.types[0] != "nil" and self.types[0] != "int" and self.types[0] != "var":
-                exit(53)
-        elif self.opcode in ["MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE"]:
-            if self.types[0] != "var" and self.types[1] not in ["string", "bool", "nil", "int", "var"]:
-                exit(53)
-        elif self.opcode == "READ":
-            if self.types[0] != "var" and self.types[1] != "type":
-                exit(53)
-        elif self.opcode in ["ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR"]:
-            if self.types[0] != "var" and self.types[1] not in ["string", "bool", "nil", "int", "var"] and self.types[2] not in ["string", "bool", "nil", "int", "var"]:
-                exit(53)
-        elif self.opcode in ["JUMPIFEQ", "JUMPIFNEQ"]:
-            if self.types[0] != "label" and self.types[1] not in ["string", "bool", "nil", "int", "var"] and self.types[2] not in ["string", "bool", "nil", "int", "var"]:
-                exit(53)
+        for type, operand in zip(self.types, OPERANDS[self.opcode]):
+            if type not in ["var", "int", "bool", "string", "nil", "label", "type"]:
+                raise InstructionError(32)
+            if type not in OPERAND_TYPES[operand]:
+                raise InstructionError(53)
+class BasicBlock:
+    def __init__(self, index, start, stop):
+        # A block holds the instructions start to stop - 1 of the program array,
+        # successors and predecessors hold indexes of blocks
+        self.index = index
+        self.start = start
+        self.stop = stop
+        self.successors = []
+        self.predecessors = []
+        # index of the block the last instruction jumps or calls to, None if it does not jump
+        self.jump_target = None
+class ControlFlowGraph:
+    def __init__(self, program):
+        # Split the program array into basic blocks and connect them,
+        # block_of holds the index of the block of every instruction
+        self.program = program
+        self.blocks = []
+        self.block_of = []
+        # indexes of the blocks a RETURN may continue in, they follow the CALL instructions
+        self.return_sites = []
+        self.split_blocks()
+        self.connect_blocks()
+    # Method to return the indexes of the instructions starting a block, a block starts the program,
+    # starts at a LABEL or follows an instruction that may jump or end the program
+    def find_leaders(self):
+        leaders = {0}
+        for index, (opcode, args, types) in enumerate(self.program):
+            if OPCODES[opcode] == "LABEL":
+                leaders.add(index)
+            elif OPCODES[opcode] in JUMP_OPCODES or OPCODES[opcode] in ["RETURN", "EXIT"]:
+                leaders.add(index + 1)
+        return sorted(leader for leader in leaders if leader < len(self.program))
+    def split_blocks(self):
+        leaders = self.find_leaders()
+        for number, start in enumerate(leaders):
+            stop = leaders[number + 1] if number + 1 < len(leaders) else len(self.program)
+            self.blocks.append(BasicBlock(number, start, stop))
+            self.block_of.extend([number] * (stop - start))
+    def connect_blocks(self):
+        for block in self.blocks:
+            opcode, args, types = self.program[block.stop - 1]
+            name = OPCODES[opcode]
+            if name in JUMP_OPCODES:
+                block.jump_target = self.block_of[args[0]]
+                block.successors.append(block.jump_target)
+            # the next block is reached unless the block ends with an unconditional jump, a return or EXIT
+            if name not in ["JUMP", "RETURN", "EXIT"] and block.index + 1 < len(self.blocks):
+                if name == "CALL":
+                    self.return_sites.append(block.index + 1)
+                elif block.index + 1 not in block.successors:
+                    block.successors.append(block.index + 1)
+        for block in self.blocks:
+            if OPCODES[self.program[block.stop - 1][0]] == "RETURN":
+                block.successors.extend(self.return_sites)
+        for block in self.blocks:
+            for successor in block.successors:
+                self.blocks[successor].predecessors.append(block.index)
+    # Method to return the block holding the instruction at the index
+    def block_at(self, index):
+        return self.blocks[self.block_of[index]]
+# Function to return the program without the instructions at the removed indexes, jump targets are moved to the new
+# indexes, so no jump may go to a removed instruction
+def remove_instructions(program, removed):
+    new_index = []
+    kept = 0
+    for index in range(len(program)):
+        new_index.append(kept)
+        if index not in removed:
+            kept += 1
+    return [(opcode, [new_index[args[0]]] + args[1:], types) if OPCODES[opcode] in JUMP_OPCODES else (opcode, args, types)
+            for index, (opcode, args, types) in enumerate(program) if index not in removed]
+class ConstantFolder:
+    NAME = "constant-folding"
+    # Opcodes reading their first argument, their second argument or their second and third argument
+    READS_FIRST = ("PUSHS", "WRITE", "EXIT", "DPRINT")
+    READS_SECOND = ("MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE")
+    READS_TWO = ("ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR", "JUMPIFEQ", "JUMPIFNEQ")
+    # Opcodes storing a value into the variable of their first argument
+    WRITES_FIRST = ("DEFVAR", "POPS", "MOVE", "NOT", "INT2CHAR", "STRLEN", "TYPE", "READ", "ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ",
+                    "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR", "SETCHAR")
+    # Opcodes that are replaced by a MOVE of their result when all their operands are constants
+    FOLDABLE = ("NOT", "INT2CHAR", "STRLEN", "TYPE", "ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "STRI2INT", "CONCAT", "GETCHAR")
+    # Superinstructions reading their second and third argument and writing their first one, and superinstructions
+    # running a MOVE into their second argument before a jump that reads their fourth and fifth argument
+    PUSH_POPS = ("PUSH_ADD_POP", "PUSH_SUB_POP", "PUSH_MUL_POP", "PUSH_IDIV_POP")
+    MOVE_JUMPS = ("MOVE_JUMPIFEQ", "MOVE_JUMPIFNEQ")
+    def __init__(self, program, orders):
+        # counters holds how many times each rule rewrote the program, orders are the source order numbers
+        # of its instructions and are kept up to date with the optimized program
+        self.program = program
+        self.orders = orders
+        self.counters = {"folded": 0, "propagated": 0, "branches": 0}
+    # Method to return the optimized program array, the program given to the optimizer is not changed
+    def run(self):
+        program = []
+        removed = set()
+        for block in ControlFlowGraph(self.program).blocks:
+            # values of global variables assigned a constant in this block, indexed by slot
+            known = {}
+            for index in range(block.start, block.stop):
+                opcode, args, types = self.program[index]
+                instruction = self.fold(opcode, list(args), list(types), known)
+                if instruction is None:
+                    removed.add(index)
+                    instruction = (opcode, args, types)
+                program.append(instruction)
+        self.orders = [order for index, order in enumerate(self.orders) if index not in removed]
+        return remove_instructions(program, removed)
+    # Method to return the instruction with known variables replaced by their values and constant expressions
+    # folded, or None if it is a conditional jump that is never taken
+    def fold(self, opcode, args, types, known):
+        name = OPCODES[opcode]
+        # a typed variant reads and writes the operands of its base opcode, programs loaded from bytecode may have them
+        base = TYPED_INSTRUCTIONS.get(name, name)
+        if base in self.MOVE_JUMPS:
+            # the MOVE happens before the jump reads its operands
+            self.propagate(args, types, [2], known)
+            self.assign(args, types, 1, 2, known)
+            self.propagate(args, types, [3, 4], known)
+            return opcode, args, types
+        if base in self.READS_FIRST:
+            reads = [0]
+        elif base in self.READS_SECOND:
+            reads = [1]
+        elif base in self.READS_TWO or base in self.PUSH_POPS:
+            reads = [1, 2]
+        else:
+            reads = []
+        self.propagate(args, types, reads, known)
+        constant = all(types[i] != "var" for i in reads)
+        if base in self.FOLDABLE and constant:
+            value = self.evaluate(opcode, args, types)
+            if value is not None:
+                opcode, args, types = OPCODE_IDS["MOVE"], [args[0], value], [types[0], value[0].name.lower()]
+                base = "MOVE"
+                self.counters["folded"] += 1
+        elif base in ["JUMPIFEQ", "JUMPIFNEQ"] and constant:
+            taken = self.evaluate(opcode, args, types)
+            if taken is not None:
+                self.counters["branches"] += 1
+                if not taken:
+                    return None
+                opcode, args, types = OPCODE_IDS["JUMP"], args[:1], types[:1]
+        if base in self.WRITES_FIRST or base in self.PUSH_POPS:
+            self.assign(args, types, 0, 1 if base == "MOVE" else None, known)
+        return opcode, args, types
+    # Method to replace the global variables at the given argument positions that have a known value by the value
+    def propagate(self, args, types, reads, known):
+        for i in reads:
+            if types[i] == "var" and args[i][0] == "GF" and args[i][1] in known:
+                args[i] = known[args[i][1]]
+                types[i] = args[i][0].name.lower()
+                self.counters["propagated"] += 1
+    # Method to record a write to the variable of argument target, its value is known if it is the constant
+    # of argument source, source is None for any other write
+    def assign(self, args, types, target, source, known):
+        if args[target][0] != "GF":
+            return
+        if source is not None and types[source] != "var":
+            known[args[target][1]] = args[source]
+        else:
+            known.pop(args[target][1], None)
+    # Method to return the result of an instruction with constant operands, for a conditional jump if it is taken,
+    # None if the instruction fails, which is left to happen when the program runs
+    def evaluate(self, opcode, args, types):
+        name = TYPED_INSTRUCTIONS.get(OPCODES[opcode], OPCODES[opcode])
+        try:
+            if name in ["JUMPIFEQ", "JUMPIFNEQ"]:
+                return values_equal(args[1], args[2]) == (name == "JUMPIFEQ")
+            value = OPERATIONS[name](*args[1:])
+        except InstructionError:
+            return None
+        # A folded CONCAT may give a rope, constants of the program are plain strings
+        if value[0] is STRING:
+            return (STRING, str(value[1]))
+        return value
+class DeadCodeEliminator:
+    NAME = "dead-code"
+    def __init__(self, program, orders):
+        # counters holds how many blocks and instructions were removed, removed describes every removed block
+        # by its label or the source order number of its first instruction
+        self.program = program
+        self.orders = orders
+        self.counters = {"blocks": 0, "instructions": 0}
+        self.removed = []
+    # Method to return the indexes of the blocks reachable from the first instruction, a CALL also reaches
+    # the block after it, where its RETURN continues
+    def reachable(self, graph):
+        reached = set()
+        pending = [0] if graph.blocks else []
+        while pending:
+            block = graph.blocks[pending.pop()]
+            if block.index in reached:
+                continue
+            reached.add(block.index)
+            pending.extend(block.successors)
+            if OPCODES[self.program[block.stop - 1][0]] == "CALL" and block.index + 1 < len(graph.blocks):
+                pending.append(block.index + 1)
+        return reached
+    # Method to return the program without the unreachable blocks
+    def run(self):
+        graph = ControlFlowGraph(self.program)
+        reached = self.reachable(graph)
+        removed = set()
+        for block in graph.blocks:
+            if block.index in reached:
+                continue
+            removed.update(range(block.start, block.stop))
+            self.counters["blocks"] += 1
+            self.counters["instructions"] += block.stop - block.start
+            opcode, args, types = self.program[block.start]
+            if OPCODES[opcode] == "LABEL":
+                self.removed.append("label {}: {} instructions".format(args[0], block.stop - block.start))
+            else:
+                self.removed.append("order {}: {} instructions".format(self.orders[block.start], block.stop - block.start))
+        self.orders = [order for index, order in enumerate(self.orders) if index not in removed]
+        return remove_instructions(self.program, removed)
+class TypeInference:
+    NAME = "type-inference"
+    # Types of the values the instructions store into their first argument
+    RESULT_TYPES = {"ADD": INT, "SUB": INT, "MUL": INT, "IDIV": INT, "STRLEN": INT, "STRI2INT": INT, "LT": BOOL, "GT": BOOL, "EQ": BOOL,
+                    "AND": BOOL, "OR": BOOL, "NOT": BOOL, "CONCAT": STRING, "GETCHAR": STRING, "INT2CHAR": STRING, "TYPE": STRING,
+                    "SETCHAR": STRING}
+    def __init__(self, program, orders):
+        # counters holds how many instructions were replaced by each variant,
+        # the orders of the instructions do not change as every instruction keeps its place
+        self.program = program
+        self.orders = orders
+        self.counters = {name.lower(): 0 for name in TYPED_INSTRUCTIONS}
+    # Method to return the program with the instructions whose operand types are proven replaced by their unchecked variants
+    def run(self):
+        graph = ControlFlowGraph(self.program)
+        states = self.analyze(graph)
+        program = list(self.program)
+        for block in graph.blocks:
+            if block.index not in states:
+                continue
+            state = dict(states[block.index])
+            for index in range(block.start, block.stop):
+                program[index] = self.specialize(program[index], state)
+                self.transfer(program[index], state)
+        return program
+    # Method to return the state at the start of every reachable block, a state maps the slots of global variables
+    # that surely hold a value to its type, a block after a CALL starts knowing nothing, since the function may change anything
+    def analyze(self, graph):
+        states = {0: {}} if graph.blocks else {}
+        pending = list(states)
+        while pending:
+            block = graph.blocks[pending.pop()]
+            state = dict(states[block.index])
+            for index in range(block.start, block.stop):
+                self.transfer(self.program[index], state)
+            for successor in block.successors:
+                incoming = {} if successor in graph.return_sites else state
+                if successor not in states:
+                    states[successor] = dict(incoming)
+                else:
+                    merged = {slot: type for slot, type in states[successor].items() if incoming.get(slot) is type}
+                    if merged == states[successor]:
+                        continue
+                    states[successor] = merged
+                pending.append(successor)
+        return states
+    # Method to update the state by an instruction that did not exit
+    def transfer(self, instruction, state):
+        opcode, args, types = instruction
+        name = TYPED_INSTRUCTIONS.get(OPCODES[opcode], OPCODES[opcode])
+        # programs loaded from bytecode may have superinstructions, which write an int into their first argument
+        # or run a MOVE into their second one
+        if name in ConstantFolder.MOVE_JUMPS:
+            target = 1
+            result = self.proven_type(args[2], types[2], state)
+        elif name in ConstantFolder.PUSH_POPS:
+            target = 0
+            result = INT
+        elif name in ConstantFolder.WRITES_FIRST:
+            target = 0
+            if name == "MOVE":
+                result = self.proven_type(args[1], types[1], state)
+            else:
+                result = self.RESULT_TYPES.get(name)
+        else:
+            return
+        if args[target][0] != "GF":
+            return
+        if result is None:
+            state.pop(args[target][1], None)
+        else:
+            state[args[target][1]] = result
+    # Method to return the type of a symbol if it surely has a value of that type, None otherwise
+    def proven_type(self, arg, type, state):
+        if type != "var":
+            return arg[0]
+        if arg[0] == "GF":
+            return state.get(arg[1])
+        return None
+    # Method to return the instruction or its unchecked variant if the types of its operands are proven
+    def specialize(self, instruction, state):
+        opcode, args, types = instruction
+        name = OPCODES[opcode]
+        if name not in ["ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "CONCAT", "JUMPIFEQ", "JUMPIFNEQ"]:
+            return instruction
+        type1 = self.proven_type(args[1], types[1], state)
+        type2 = self.proven_type(args[2], types[2], state)
+        if type1 is None or type1 is not type2:
+            return instruction
+        if name in ["ADD", "SUB", "MUL", "IDIV"] and type1 is INT:
+            variant = name + "_INT"
+        elif name in ["LT", "GT"] and type1 is not NIL:
+            variant = name + "_TYPED"
+        elif name in ["EQ", "JUMPIFEQ", "JUMPIFNEQ"]:
+            variant = name + "_TYPED"
+        elif name == "CONCAT" and type1 is STRING:
+            variant = "CONCAT_STRING"
+        else:
+            return instruction
+        self.counters[variant.lower()] += 1
+        return (OPCODE_IDS[variant], args, types)
+class PeepholeOptimizer:
+    NAME = "peephole"
+    # Sequences of a stack operation between two PUSHS and a POPS, fused into a superinstruction
+    FUSED_STACK_OPERATIONS = {"ADDS": "PUSH_ADD_POP", "SUBS": "PUSH_SUB_POP", "MULS": "PUSH_MUL_POP", "IDIVS": "PUSH_IDIV_POP"}
+    FUSED_JUMPS = {"JUMPIFEQ": "MOVE_JUMPIFEQ", "JUMPIFNEQ": "MOVE_JUMPIFNEQ"}
+    def __init__(self, program, orders):
+        # counters holds how many times each rule rewrote the program, a fused instruction has the order
+        # of the first instruction of its sequence
+        self.program = program
+        self.orders = orders
+        self.counters = {"jump-threading": 0, "unused-label": 0, "push-arith-pop": 0, "move-jumpif": 0}
+    # Method to return the optimized program array, the program given to the optimizer is not changed
+    def run(self):
+        program = self.thread_jumps(self.program)
+        return self.fuse(program)
+    # Method to retarget jumps to a LABEL directly followed by JUMP to the label that JUMP goes to
+    def thread_jumps(self, program):
+        threaded = []
+        for opcode, args, types in program:
+            if OPCODES[opcode] in JUMP_OPCODES:
+                target = args[0]
+                seen = {target}
+                while target + 1 < len(program) and OPCODES[program[target + 1][0]] == "JUMP" and program[target + 1][1][0] not in seen:
+                    target = program[target + 1][1][0]
+                    seen.add(target)
+                if target != args[0]:
+                    self.counters["jump-threading"] += 1
+                    args = [target] + args[1:]
+            threaded.append((opcode, args, types))
+        return threaded
+    # Method to drop labels no jump goes to and fuse common sequences, jump targets are moved to the new indexes
+    def fuse(self, program):
+        targets = {args[0] for opcode, args, types in program if OPCODES[opcode] in JUMP_OPCODES}
+        fused = []
+        orders = []
+        new_index = {}
+        index = 0
+        while index < len(program):
+            opcode, args, types = program[index]
+            name = OPCODES[opcode]
+            names = [OPCODES[instruction[0]] for instruction in program[index:index + 4]]
+            new_index[index] = len(fused)
+            if name == "LABEL" and index not in targets:
+                self.counters["unused-label"] += 1
+                index += 1
+            elif names[:2] == ["PUSHS", "PUSHS"] and len(names) == 4 and names[2] in self.FUSED_STACK_OPERATIONS and names[3] == "POPS":
+                pops = program[index + 3]
+                fused.append((OPCODE_IDS[self.FUSED_STACK_OPERATIONS[names[2]]], [pops[1][0], args[0], program[index + 1][1][0]],
+                              [pops[2][0], types[0], program[index + 1][2][0]]))
+                orders.append(self.orders[index])
+                self.counters["push-arith-pop"] += 1
+                index += 4
+            elif name == "MOVE" and len(names) > 1 and names[1] in self.FUSED_JUMPS:
+                jump = program[index + 1]
+                fused.append((OPCODE_IDS[self.FUSED_JUMPS[names[1]]], [jump[1][0]] + args + jump[1][1:], [jump[2][0]] + types + jump[2][1:]))
+                orders.append(self.orders[index])
+                self.counters["move-jumpif"] += 1
+                index += 2
+            else:
+                fused.append((opcode, args, types))
+                orders.append(self.orders[index])
+                index += 1
+        self.orders = orders
+        # every jump target is a LABEL that was kept
+        return [(opcode, [new_index[args[0]]] + args[1:], types) if OPCODES[opcode] in JUMP_OPCODES else (opcode, args, types)
+                for opcode, args, types in fused]
+class ProgramCache:
+    def __init__(self, directory):
+        # Validated programs are pickled into the directory, one file per source file and interpreter version
+        self.directory = directory
+    # Method to return the key of a source file, a hash of the interpreter code and the content of the file
+    def key(self, sourcefile):
+        digest = hashlib.sha256()
+        with open(os.path.abspath(__file__), "rb") as interpreter:
+            digest.update(interpreter.read())
+        with open(sourcefile, "rb") as source:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    # Method to return the (program, global_names, orders) triple stored under the key, or None if there is none
+    def load(self, key):
+        try:
+            with open(os.path.join(self.directory, key + ".pickle"), "rb") as cached:
+                return pickle.load(cached)
+        except Exception:
+            # a missing, unreadable or corrupted entry only means the program has to be loaded again
+            return None
+    # Method to store the program under the key, the file is replaced at once so readers never see a partial entry
+    def store(self, key, program, global_names, orders):
+        path = os.path.join(self.directory, key + ".pickle")
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as cached:
+                pickle.dump((program, global_names, orders), cached, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError:
+            # the program still runs when the cache cannot be written
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+# Binary bytecode format of a loaded program, all numbers are big-endian:
+#   header        "IPPC", u16 format version
+#   constants     u32 count, then per constant u8 type tag (the Type value) and its payload:
+#                 nil has none, bool is u8 0 or 1, int is u32 length and a signed two's complement number,
+#                 string is u32 length and UTF-8 text; every constant is stored once and shared by index
+#   globals       u32 count, then per global variable u32 index of its name in the constants
+#   instructions  u32 count, then per instruction u32 index of its order number in the source in the constants,
+#                 u8 opcode id, u8 number of arguments and per argument
+#                 u32 index of its type name in the constants, u8 operand kind and u32 operand
+# Operand kinds, the operand of a kind is given after its name
+BYTECODE_MAGIC = b"IPPC"
+BYTECODE_VERSION = 2
+CONSTANT = 0    # index of the value in the constants
+GLOBAL = 1      # slot of the global variable
+LOCAL = 2       # index of the name of the local variable in the constants
+TEMPORARY = 3   # index of the name of the temporary variable in the constants
+TARGET = 4      # index of the LABEL instruction a jump goes to
+TYPE_NAME = 5   # Type value of a type operand of READ
+TEXT = 6        # index of the text of other operands (e.g. label names) in the constants, NO_TEXT if there is none
+NO_TEXT = 0xFFFFFFFF
+# Operand kinds allowed for each letter of OPERANDS
+OPERAND_KINDS = {"v": (GLOBAL, LOCAL, TEMPORARY), "s": (CONSTANT, GLOBAL, LOCAL, TEMPORARY), "t": (TARGET,), "l": (TEXT,), "y": (TYPE_NAME,)}
+class Bytecode:
+    HEADER = struct.Struct(">4sH")
+    COUNT = struct.Struct(">I")
+    BYTE = struct.Struct(">B")
+    INSTRUCTION = struct.Struct(">IBB")
+    ARGUMENT = struct.Struct(">IBI")
+    # Method to check if a file starts with the bytecode header
+    @staticmethod
+    def is_bytecode(path):
+        try:
+            with open(path, "rb") as source:
+                return source.read(len(BYTECODE_MAGIC)) == BYTECODE_MAGIC
+        except OSError:
+            return False
+    # Method to write the program array, the global variable names and the source orders to a bytecode file
+    @classmethod
+    def write(cls, path, program, global_names, orders):
+        constants = []
+        constant_ids = {}
+        # returns the index of a constant, adding it to the constants the first time it is seen
+        def constant(value):
+            index = constant_ids.get(value)
+            if index is None:
+                index = constant_ids[value] = len(constants)
+                constants.append(value)
+            return index
+        body = bytearray()
+        body += cls.COUNT.pack(len(global_names))
+        for name in global_names:
+            body += cls.COUNT.pack(constant((STRING, name)))
+        body += cls.COUNT.pack(len(program))
+        for (opcode, args, types), order in zip(program, orders):
+            body += cls.INSTRUCTION.pack(constant((INT, order)), opcode, len(args))
+            for i, arg in enumerate(args):
+                if i == 0 and OPCODES[opcode] in JUMP_OPCODES:
+                    kind, operand = TARGET, arg
+                elif isinstance(arg, Type):
+                    kind, operand = TYPE_NAME, arg
+                elif isinstance(arg, tuple) and arg[0] == "GF":
+                    kind, operand = GLOBAL, arg[1]
+                elif isinstance(arg, tuple) and arg[0] in ["LF", "TF"]:
+                    kind, operand = LOCAL if arg[0] == "LF" else TEMPORARY, constant((STRING, arg[1]))
+                elif isinstance(arg, tuple):
+                    kind, operand = CONSTANT, constant(arg)
+                else:
+                    kind, operand = TEXT, NO_TEXT if arg is None else constant((STRING, arg))
+                body += cls.ARGUMENT.pack(constant((STRING, types[i])), kind, operand)
+        data = bytearray(cls.HEADER.pack(BYTECODE_MAGIC, BYTECODE_VERSION))
+        data += cls.COUNT.pack(len(constants))
+        for value in constants:
+            data += cls.BYTE.pack(value[0])
+            if value[0] is BOOL:
+                data += cls.BYTE.pack(value[1])
+            elif value[0] is INT:
+                number = value[1].to_bytes(value[1].bit_length() // 8 + 1, "big", signed=True)
+                data += cls.COUNT.pack(len(number)) + number
+            elif value[0] is STRING:
+                text = value[1].encode("utf-8", errors="surrogatepass")
+                data += cls.COUNT.pack(len(text)) + text
+        data += body
+        with open(path, "wb") as output:
+            output.write(data)
+    # Method to read a bytecode file, returns the program array, the global variable names and the source orders
+    @classmethod
+    def read(cls, path):
+        with open(path, "rb") as source:
+            data = source.read()
+        try:
+            magic, version = cls.HEADER.unpack_from(data, 0)
+            if magic != BYTECODE_MAGIC or version != BYTECODE_VERSION:
+                exit(31)
+            position = cls.HEADER.size
+            constants = []
+            (count,) = cls.COUNT.unpack_from(data, position)
+            position += cls.COUNT.size
+            for _ in range(count):
+                tag = Type(data[position])
+                position += 1
+                if tag is NIL:
+                    constants.append(NIL_VALUE)
+                elif tag is BOOL:
+                    constants.append(TRUE if data[position] else FALSE)
+                    position += 1
+                else:
+                    (length,) = cls.COUNT.unpack_from(data, position)
+                    position += cls.COUNT.size
+                    payload = data[position:position + length]
+                    if len(payload) != length:
+                        exit(31)
+                    position += length
+                    if tag is INT:
+                        constants.append((INT, int.from_bytes(payload, "big", signed=True)))
+                    else:
+                        constants.append((STRING, payload.decode("utf-8", errors="surrogatepass")))
+            (count,) = cls.COUNT.unpack_from(data, position)
+            position += cls.COUNT.size
+            global_names = [constants[index][1] for index in struct.unpack_from(">{}I".format(count), data, position)]
+            position += cls.COUNT.size * count
+            (count,) = cls.COUNT.unpack_from(data, position)
+            position += cls.COUNT.size
+            program = []
+            orders = []
+            for _ in range(count):
+                order, opcode, argc = cls.INSTRUCTION.unpack_from(data, position)
+                position += cls.INSTRUCTION.size
+                if constants[order][0] is not INT:
+                    exit(31)
+                orders.append(constants[order][1])
+                if opcode >= len(OPCODES) or argc != len(OPERANDS[OPCODES[opcode]]):
+                    exit(32)
+                # the types a typed variant relies on are not checked in the file, so it is loaded as its base
+                # instruction and --optimize proves the types again
+                opcode = OPCODE_IDS[TYPED_INSTRUCTIONS.get(OPCODES[opcode], OPCODES[opcode])]
+                args = []
+                types = []
+                for operands in OPERANDS[OPCODES[opcode]]:
+                    type_index, kind, operand = cls.ARGUMENT.unpack_from(data, position)
+                    position += cls.ARGUMENT.size
+                    if kind not in OPERAND_KINDS[operands]:
+                        exit(32)
+                    types.append(constants[type_index][1])
+                    # the handlers tell variables from constants by the type name, so it has to match the operand
+                    if kind == CONSTANT:
+                        if types[-1] != constants[operand][0].name.lower():
+                            exit(32)
+                    elif types[-1] != {"v": "var", "s": "var", "t": "label", "l": "label", "y": "type"}[operands]:
+                        exit(32)
+                    if kind == CONSTANT:
+                        args.append(constants[operand])
+                    elif kind == GLOBAL:
+                        if operand >= len(global_names):
+                            exit(31)
+                        args.append(("GF", operand))
+                    elif kind == LOCAL or kind == TEMPORARY:
+                        args.append(("LF" if kind == LOCAL else "TF", constants[operand][1]))
+                    elif kind == TARGET:
+                        if operand >= count:
+                            exit(31)
+                        args.append(operand)
+                    elif kind == TYPE_NAME:
+                        if Type(operand) not in READ_TYPES.values():
+                            exit(32)
+                        args.append(Type(operand))
+                    elif kind == TEXT:
+                        args.append(None if operand == NO_TEXT else constants[operand][1])
+                    else:
+                        exit(31)
+                program.append((opcode, args, types))
+            for opcode, args, types in program:
+                if OPCODES[opcode] in JUMP_OPCODES and program[args[0]][0] != OPCODE_IDS["LABEL"]:
+                    exit(31)
+        except (struct.error, IndexError, ValueError):
+            # a truncated or damaged file
+            exit(31)
+        return program, global_names, orders
+class OutputBuffer:
+    def __init__(self, stream, limit=65536):
+        # Collect written text in a list and pass it to the stream once the limit of characters is reached
+        self.stream = stream
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+    # Method to append text to the buffer
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.limit:
+            self.flush()
+    # Method to write the buffered text to the stream
+    def flush(self):
+        if self.parts:
+            self.stream.write("".join(self.parts))
+            self.parts = []
+            self.size = 0
+        self.stream.flush()
+class InputReader:
+    def __init__(self, inputfile, chunk_size=1 << 20):
+        # Regular input files are memory mapped and lines are cut out of the mapping,
+        # standard input and files that cannot be mapped are read through a buffer of chunk_size bytes
+        self.data = None
+        self.position = 0
+        self.stream = None
+        if inputfile is not sys.stdin:
+            try:
+                self.data = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty files, pipes and devices cannot be mapped
+                self.data = None
+        if self.data is None:
+            self.stream = open(inputfile.fileno(), "rb", buffering=chunk_size, closefd=False)
+    # Method to return the next line without its line break, or None at the end of the input
+    def readline(self):
+        if self.data is None:
+            line = self.stream.readline()
+            if not line:
+                return None
+            if line[-1:] == b"\n":
+                line = line[:-1]
+        else:
+            if self.position >= len(self.data):
+                return None
+            end = self.data.find(b"\n", self.position)
+            if end == -1:
+                end = len(self.data)
+            line = self.data[self.position:end]
+            self.position = end + 1
+        # CRLF line breaks give the same lines as LF ones, as when the input was read in text mode
+        if line[-1:] == b"\r":
+            line = line[:-1]
+        return line.decode("utf-8", errors="replace")
 class Interpret:
-    def __init__(self, instr_dict, label_dict,inputfile):
-        # Initialize dictionaries for the frames and check if the local and temp frames exist
-        self.global_frame = {}
-        self.local_frame = {}
-        self.temp_frame = {}
-        self.lf_exists = False
-        self.tf_exists = False
-        # Initialize the call stack and the main stack
+    def __init__(self, program, global_names, inputfile, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+        # Initialize the frames, the global frame has one slot per global variable which is None until the variable is defined,
+        # local frames are dicts on the frame stack, the top one is LF, and the temporary frame is None until CREATEFRAME
+        self.global_frame = [None] * len(global_names)
+        self.global_names = global_names
+        self.frame_stack = []
+        self.temp_frame = None
+        # Initialize the call stack with its limit and the deepest it was, and the main stack
         self.call_stack = []
+        self.max_call_depth = max_call_depth
+        self.peak_call_depth = 0
         self.stack = []
-        # Assign values to the instruction dictionary, label dictionary, and input file
-        self.instr_dict = instr_dict
-        self.label_dict = label_dict
-        self.input_file = inputfile
-        # Call the "interpret" method to execute instructions
-        self.interpret()
-        # Initialize the opcode and scope values to None and 0 respectively
-        self.opcode = None
-        self.scope = 0
+        # Assign values to the program array, input file and the buffer for the standard output
+        self.program = program
+        self.input_file = InputReader(inputfile)
+        self.output = OutputBuffer(sys.stdout)
     
-    # A method to convert HTML entities and Unicode characters to their corresponding symbols.
-    def rewrite_string(self,args):
-        # Convert HTML entities to symbols
-        args = re.sub('&lt;', '<', args)
-        args = re.sub('&gt;', '>', args)
-        args = re.sub('&amp;', '&', args)
-        args = re.sub('&quot;', '"', args)
-        args = re.sub('&apos;', '\'', args)
-        # Convert Unicode characters to symbols
-        pattern = r'\\\d{3}'
-        match = re.search(pattern, args)
-        input_to_read = args
-        while match:
-            num = int(match.group()[1:])
-            char = chr(num)
-            input_to_read = re.sub(pattern, char, input_to_read, count=1)
-            match = re.search(pattern, input_to_read)
-        # Return the converted string
-        return input_to_read
-            
+    # Method to return the (type, value) value of a variable given by its (frame, name) pair
+    def get_var(self, var):
+        frame, name = var
+        if frame == "GF":
+            value = self.global_frame[name]
+        elif frame == "LF":
+            # Check if local frame exists
+            if not self.frame_stack:
+                exit(55)
+            value = self.frame_stack[-1].get(name)
+        else:
+            # Check if temporary frame exists
+            if self.temp_frame is None:
+                exit(55)
+            value = self.temp_frame.get(name)
+        # Exit if the variable is not defined in its frame
+        if value is None:
+            exit(54)
+        return value
+
+    # Method to return the (type, value) value of a symbol, constants were converted when the program was loaded
+    def get_symb(self, arg, type):
+        if type == "var":
+            return self.get_var(arg)
+        return arg
 
-    def getfromvar(self, args, type, i,typ,value):
-        # Split the variable name to get the frame name and variable name
-        name = args[i].split('@')
-        # If the frame is global frame (GF)
-        if name[0] == "GF":
-            # Check if variable exists in global frame
-            if name[1] not in self.global_frame:
+    # Method to read both symbols of a three-argument instruction, exits if one of them has no value
+    def get_operands(self, args, type):
+        symb1 = self.get_symb(args[1], type[1])
+        symb2 = self.get_symb(args[2], type[2])
+        if symb1[0] is None or symb2[0] is None:
+            exit(56)
+        return symb1, symb2
+
+    # Method to convert a value to the text printed by WRITE
+    def to_output(self, symb):
+        if symb[0] is STRING:
+            return str(symb[1])
+        if symb[0] is INT:
+            return str(symb[1])
+        if symb[0] is BOOL:
+            return "true" if symb[1] else "false"
+        return ""
+
+    # Method to convert a value to the type@value form used by BREAK
+    def to_debug(self, symb):
+        if symb[0] is None:
+            return ""
+        if symb[0] is NIL:
+            return "nil@nil"
+        return "{}@{}".format(symb[0].name.lower(), self.to_output(symb))
+
+    # Method to store a value into a variable
+    def set_var(self, var, value):
+        frame, name = var
+        if frame == "GF":
+            if self.global_frame[name] is None:
                 exit(54)
-            else:
-                # Save current variable value and type to value and typ lists
-                value[i] = args[i]
-                typ[i] = type[i]
-                 # Get the type and value of the variable from global frame
-                type[i] = self.global_frame[name[1]][0]
-                args[i] = self.global_frame[name[1]][1]
-        # If the frame is local frame (LF)
-        if name[0] == "LF":
+            self.global_frame[name] = value
+        elif frame == "LF":
             # Check if local frame exists
-            if not self.lf_exists:
+            if not self.frame_stack:
                 exit(55)
-            elif self.scope in self.local_frame:
-                if name[1] not in self.local_frame[self.scope]:
-                    exit(54)
-            else:
+            if name not in self.frame_stack[-1]:
                 exit(54)
-            value[i] = args[i]
-            typ[i] = type[i]
-            type[i] = self.local_frame[self.scope][name[1]][0]
-            args[i] = self.local_frame[self.scope][name[1]][1]
-         # If the frame is temporary frame (TF)
-        if name[0] == "TF":
-            if not self.tf_exists:
+            self.frame_stack[-1][name] = value
+        else:
+            # Check if temporary frame exists
+            if self.temp_frame is None:
                 exit(55)
-            elif name[1] not in self.temp_frame:
+            if name not in self.temp_frame:
                 exit(54)
-            else:
-                value[i] = args[i]
-                typ[i] = type[i]
-                type[i] = self.temp_frame[name[1]][0]
-                args[i] = self.temp_frame[name[1]][1]
-        # Return updated typ and value lists
-        return typ,value
+            self.temp_frame[name] = value
 
     def interpret(self):
-        # initialize the scope and count
-        self.scope = None
-        count = 1
-        # iterate through each instruction
-        while  (count < len(self.instr_dict) + 1):
-            # retrieve the opcode, arguments, and type of the current instruction
-            self.opcode = self.instr_dict[str(count)]["opcode"]
-            args = self.instr_dict[str(count)]["args"]
-            type = self.instr_dict[str(count)]["type"]
-            #CREATEFRAME
-            if self.opcode == "CREATEFRAME":
-                self.tf_exists = True
-                self.temp_frame = {}
-            #PUSHFRAME
-            elif self.opcode == "PUSHFRAME":
-                if not self.tf_exists:
-                    exit(55)
-                self.lf_exists = True
-                if self.scope == None:
-                    self.scope = 0
-                self.scope +=1
-                self.local_frame[self.scope] = {}
-                self.local_frame[self.scope].update(self.temp_frame)
-                self.temp_frame = {}
-                self.tf_exists = False
-            #POPFRAME
-            elif self.opcode == "POPFRAME":
-                if not self.lf_exists:
-                    exit(55)
-                if len(self.local_frame[self.scope]) != 0:
-                    key, value = self.local_frame[self.scope].popitem()
-                    self.local_frame.popitem()
-                    self.scope -=1
-                    self.temp_frame = {key: value}
-                    self.tf_exists = True
-                else:
-                    exit(56)
-                if not self.local_frame:
-                    self.lf_exists = False
-            #RETURN
-            elif self.opcode == "RETURN":
-                if len(self.call_stack) == 0:
-                    exit(56)
-                count = self.call_stack[-1]
-                self.call_stack = self.call_stack[:-1]
-            elif self.opcode == "BREAK":
-                print('The position in the code : {}'.format(self.opcode))
-                print('Global frame : {}'.format(self.global_frame))
-                print('Local frame : {}'.format(self.local_frame[self.scope]))
-                print('Temporary frame : {}'.format(self.temp_frame))
-                print('The number of instructions being executed:{}'.format(count+1))
-            elif self.opcode == "CLEARS":
-                self.stack = []
-            #ADDS
-            elif self.opcode == "ADDS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] != "int":
-                    exit(53)
-                self.stack.append(["int",int(value1[1])+int(value2[1])])
-            #SUBS
-            elif self.opcode == "SUBS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] != "int":
-                    exit(53)
-                self.stack.append(["int",int(value1[1])-int(value2[1])])
-            #MULS
-            elif self.opcode == "MULS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] != "int":
-                    exit(53)
-                self.stack.append(["int",int(value1[1])*int(value2[1])])
-            #IDIVS
-            elif self.opcode == "IDIVS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] != "int":
-                    exit(53)
-                if int(value2[1]) == 0:
-                    exit(57)
-                self.stack.append(["int",int(value1[1])//int(value2[1])])
-            #LTS
-            elif self.opcode == "LTS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] == "nil" or value1[0] == "var":
-                    exit(53)
-                self.stack.append([value1[1]<value2[1]])
-            #GTS
-            elif self.opcode == "GTS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] == "nil" or value1[0] == "var":
-                    exit(53)
-                self.stack.append([value1[1]>value2[1]])
-            #EQS
-            elif self.opcode == "EQS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value1[0] != value2[0] or value1[0] == "var":
-                    if value1[0] != "nil" and value2[0] != "nil":
-                        exit(53)
-                self.stack.append([value1[1] == value2[1]])
-            #ANDS
-            elif self.opcode == "ANDS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value2[0] != value1[0] or value1[0] != "bool":
-                    exit(53)
-                else:
-                    if value1[1] == "true" and value2[1] == "true":
-                        self.stack.append(["bool","true"])
-                    else:
-                        self.stack.append(["bool","false"])
-            #ORS
-            elif self.opcode == "ORS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value2[0] != value1[0] or value1[0] != "bool":
-                    exit(53)
-                else:
-                    if value1[1] == "false" and value2[1] == "false":
-                        self.stack.append(["bool","false"])
-                    else:
-                        self.stack.append(["bool","true"])
-            #NOTS
-            elif self.opcode == "NOTS":
-                if len(self.stack) < 1:
-                    exit(56)
-                value = self.stack.pop()
-                if value[0] != "bool":
-                    exit(53)
-                else:
-                    if value[1] == "true":
-                        self.stack.append(["bool","false"])
-                    else:
-                        self.stack.append(["bool","true"])
-            #INT2CHARS
-            elif self.opcode == "INT2CHARS":
-                if len(self.stack) < 1:
-                    exit(56)
-                value = self.stack.pop()
-                if value[0] != "int":
-                    exit(53)
-                try:
-                    value[1] = chr(int(value[1]))
-                except ValueError:
-                    exit(58)
-                self.stack.append(["string",value[1]])
-            #STRI2INTS
-            elif self.opcode == "STRI2INTS":
-                if len(self.stack) < 2:
-                    exit(56)
-                value2 = self.stack.pop()
-                value1 = self.stack.pop()
-                if value2[0] != "int" or value1[0] != "string":
-                    exit(53)
-                try:
-                    index = int(value2[1])
-                except ValueError:
-                    exit(53)
-                if index >= len(value1[1]) or index < 0:
-                    exit(58)
-                char = value1[1][index]
-                self.stack.append(["int",ord(char)])
-            elif self.opcode == "DEFVAR":
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] in self.global_frame:
-                        exit(52)
-                    else:
-                        self.global_frame[name[1]] = [None,None]
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    if name[1] in self.temp_frame:
-                        exit(52)
-                    else:
-                        self.temp_frame[name[1]] = [None, None]
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope != None:
-                        if self.scope in self.local_frame:
-                            if name[1] in self.local_frame[self.scope]:
-                                exit(52)
-                    else:
-                        self.scope = 0
-                    self.local_frame[self.scope] = {}
-                    self.local_frame[self.scope][name[1]] = [None, None]
-            #POPS
-            elif self.opcode == "POPS":
-                if not bool(self.stack):
-                    exit(56)
-                else:
-                    name = args[0].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        value = self.stack.pop()
-                        self.global_frame[name[1]] = [value[0], value[1]]
-                    elif name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        if name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            value = self.stack.pop()
-                            self.temp_frame[name[1]] = [value[0], value[1]]
-                    elif name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        scope = len(self.local_frame[self.scope]) - 1
-                        value = self.stack.pop()
-                        self.local_frame[self.scope][scope][name[1]] = [value[0], value[1]]
-            #PUSHS
-            elif self.opcode == "PUSHS":
-                # symb = args[0]
-                if args[0] == None or type[0] == None:
-                    exit(56)
-                if type[0] == "var":
-                    name = args[0].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            l_type = self.global_frame[name[1]][0]
-                            l_value = self.global_frame[name[1]][1]
-                            if l_type == None or l_value == None:
-                                exit(56)
-                            self.stack.append([l_type, l_value])
-                    elif name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        if name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            l_type = self.temp_frame[name[1]][0]
-                            l_value = self.temp_frame[name[1]][1]
-                            if l_type == None or l_value == None:
-                                exit(56)
-                            self.stack.append([l_type, l_value])
-                    elif name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        l_type = self.local_frame[self.scope][name[1]][0]
-                        l_value = self.local_frame[self.scope][name[1]][1]
-                        if l_type == None or l_value == None:
-                            exit(56)
-                        self.stack.append([l_type, l_value])
-                else:
-                    self.stack.append([type[0],args[0]])
-            #MOVE
-            elif self.opcode == "MOVE":
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    if type[1] == "string":
-                        args[1] = ""
-                    else:
-                        exit(56)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    elif type[1] == "var":
-                        symb = args[1].split('@')
-                        if symb[0] == "GF":
-                            if symb[1] not in self.global_frame:
-                                exit(54)
-                            else:
-                                if self.global_frame[symb[1]][1] == None:
-                                    if self.global_frame[symb[1]][0] == "string":
-                                        self.global_frame[symb[1]][1] = ""
-                                    else:
-                                        exit(56)
-                                self.global_frame[name[1]][0] = self.global_frame[symb[1]][0]
-                                self.global_frame[name[1]][1] = self.global_frame[symb[1]][1]
-                        elif symb[0] == "TF":
-                            if not self.tf_exists:
-                                exit(55)
-                            elif symb[1] not in self.temp_frame:
-                                exit(54)
-                            else:
-                                if self.temp_frame[symb[1]][1] == None:
-                                    if self.temp_frame[symb[1]][0] == "string":
-                                        self.temp_frame[symb[1]][1] = ""
-                                    else:
-                                        exit(56)
-                                self.global_frame[name[1]][0] = self.temp_frame[symb[1]][0]
-                                self.global_frame[name[1]][1] = self.temp_frame[symb[1]][1]
-                        elif symb[0] == "LF":
-                            if not self.lf_exists:
-                                exit(55)
-                            if self.scope in self.local_frame:
-                                if symb[1] not in self.local_frame[self.scope]:
-                                    exit(54)
-                            else:
-                                    exit(54)
-                            if self.local_frame[self.scope][symb[1]][1] == None:
-                                if self.local_frame[self.scope][symb[1]][0] == "string":
-                                    self.local_frame[self.scope][symb[1]][1] = ""
-                                else:
-                                    exit(56)
-                            self.global_frame[name[1]][0] = self.local_frame[self.scope][symb[1]][0]
-                            self.global_frame[name[1]][1] = self.local_frame[self.scope][symb[1]][1]
-                    else:
-                        self.global_frame[name[1]][0] = type[1]
-                        self.global_frame[name[1]][1] = args[1]
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    if type[1] == "var":
-                        symb = args[1].split('@')
-                        if symb[0] == "GF":
-                            if symb[1] not in self.global_frame:
-                                exit(54)
-                            else:
-                                self.local_frame[self.scope][name[1]][0] = self.global_frame[symb[1]][0]
-                                self.local_frame[self.scope][name[1]][1] = self.global_frame[symb[1]][1]
-                        elif symb[0] == "TF":
-                            if not self.tf_exists:
-                                exit(55)
-                            elif symb[1] not in self.temp_frame:
-                                exit(54)
-                            else:
-                                self.local_frame[self.scope][name[1]][0] = self.temp_frame[symb[1]][0]
-                                self.local_frame[self.scope][name[1]][1] = self.temp_frame[symb[1]][1]
-                        elif symb[0] == "LF":
-                            if not self.lf_exists:
-                                exit(55)
-                            elif symb[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                            else:
-                                self.local_frame[self.scope][name[1]][0] = self.local_frame[self.scope][symb[1]][0]
-                                self.local_frame[self.scope][name[1]][1] = self.local_frame[self.scope][symb[1]][1]
-                    else:
-                        self.local_frame[self.scope][name[1]][0] = type[1]
-                        self.local_frame[self.scope][name[1]][1] = args[1]
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    elif type[1] == "var":
-                        symb = args[1].split('@')
-                        if symb[0] == "GF":
-                            if symb[1] not in self.global_frame:
-                                exit(54)
-                            else:
-                                self.temp_frame[name[1]][0] = self.global_frame[symb[1]][0]
-                                self.temp_frame[name[1]][1] = self.global_frame[symb[1]][1]
-                        elif symb[0] == "TF":
-                            if not self.tf_exists:
-                                exit(55)
-                            elif symb[1] not in self.temp_frame:
-                                exit(54)
-                            else:
-                                self.temp_frame[name[1]][0] = self.temp_frame[symb[1]][0]
-                                self.temp_frame[name[1]][1] = self.temp_frame[symb[1]][1]
-                        elif symb[0] == "LF":
-                            if not self.lf_exists:
-                                exit(55)
-                            elif symb[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                            else:
-                                self.temp_frame[name[1]][0] = self.local_frame[self.scope][symb[1]][0]
-                                self.temp_frame[name[1]][1] = self.local_frame[self.scope][symb[1]][1]
-                    else:
-                        self.temp_frame[name[1]][0] = type[1]
-                        self.temp_frame[name[1]][1] = args[1]
-            #CALL
-            elif self.opcode == "CALL":
-                if args[0] not in self.label_dict:
-                    exit(52)
-                else:
-                    self.call_stack.append(count)
-                    count = int(self.label_dict[args[0]])
-            #ADD
-            elif self.opcode == "ADD":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "int":
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "int"
-                        self.global_frame[name[1]][1] = int(args[1]) + int(args[2])
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "int"
-                    self.local_frame[self.scope][name[1]][1] = int(args[1]) + int(args[2])
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "int"
-                        self.temp_frame[name[1]][1] = int(args[1]) + int(args[2])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #SUB
-            elif self.opcode == "SUB":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "int":
-                    if type[1] == None or type[2] == None:
-                        exit(56)
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "int"
-                        self.global_frame[name[1]][1] = int(args[1]) - int(args[2])
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "int"
-                    self.local_frame[self.scope][name[1]][1] = int(args[1]) - int(args[2])
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "int"
-                        self.temp_frame[name[1]][1] = int(args[1]) - int(args[2])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #MUL
-            elif self.opcode == "MUL":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "int":
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "int"
-                        self.global_frame[name[1]][1] = int(args[1]) * int(args[2])
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "int"
-                    self.local_frame[self.scope][name[1]][1] = int(args[1]) * int(args[2])
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "int"
-                        self.temp_frame[name[1]][1] = int(args[1]) * int(args[2])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #IDIV
-            elif self.opcode == "IDIV":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "int":
-                    exit(53)
-                if int(args[2]) == 0:
-                    exit(57)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "int"
-                        self.global_frame[name[1]][1] = int(args[1]) // int(args[2])
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "int"
-                    self.local_frame[self.scope][name[1]][1] = int(args[1]) // int(args[2])
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "int"
-                        self.temp_frame[name[1]][1] = int(args[1]) // int(args[2])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #LT
-            elif self.opcode == "LT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if type[1] != type[2] or type[1] == "nil" or type[2] == "var":
-                    exit(53)
-                if type[1] == "string":
-                    args[1] = self.rewrite_string(args[1])
-                    args[2] = self.rewrite_string(args[2])
-                if type[1] == "int":
-                    args[1] = int(args[1])
-                    args[2] = int(args[2])
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        self.global_frame[name[1]][1] = str(args[1] < args[2]).lower()
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    self.local_frame[self.scope][name[1]][1] = str(args[1] < args[2]).lower()
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        self.temp_frame[name[1]][1] = str(args[1] < args[2]).lower()
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #GT
-            elif self.opcode == "GT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if type[1] != type[2] or type[1] == "nil" or type[2] == "var":
-                    exit(53)
-                if type[1] == "string":
-                    args[1] = self.rewrite_string(args[1])
-                    args[2] = self.rewrite_string(args[2])
-                if type[1] == "int":
-                    args[1] = int(args[1])
-                    args[2] = int(args[2])
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        self.global_frame[name[1]][1] = str(args[1] > args[2]).lower()
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    self.local_frame[self.scope][name[1]][1] = str(args[1] > args[2]).lower()
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        self.temp_frame[name[1]][1] = str(args[1] > args[2]).lower()
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #EQ
-            elif self.opcode == "EQ":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if type[1] != type[2] or type[2] == "var":
-                    if type[1] != "nil" and type[2] != "nil":
-                        exit(53)
-                if type[1] == "string":
-                    args[1] = self.rewrite_string(args[1])
-                    args[2] = self.rewrite_string(args[2])
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        self.global_frame[name[1]][1] = str(args[1] == args[2]).lower()
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    self.local_frame[self.scope][name[1]][1] = str(args[1] == args[2]).lower()
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        self.temp_frame[name[1]][1] = str(args[1] == args[2]).lower()
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #AND
-            elif self.opcode == "AND":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "bool":
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        if args[1] == "true" and args[2] == "true":
-                            self.global_frame[name[1]][1] = "true"
-                        else:
-                            self.global_frame[name[1]][1] = "false"
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    if args[1] == "true" and args[2] == "true":
-                        self.local_frame[self.scope][name[1]][1] = "true"
-                    else:
-                        self.local_frame[self.scope][name[1]][1] = "false"
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        if args[1] == "true" and args[2] == "true":
-                            self.temp_frame[name[1]][1] = "true"
-                        else:
-                            self.temp_frame[name[1]][1] = "false"
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #OR
-            elif self.opcode == "OR":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != type[2] or type[1] != "bool":
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        if args[1] == "false" and args[2] == "false":
-                            self.global_frame[name[1]][1] = "false"
-                        else:
-                            self.global_frame[name[1]][1] = "true"
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    if args[1] == "false" and args[2] == "false":
-                        self.local_frame[self.scope][name[1]][1] = "false"
-                    else:
-                        self.local_frame[self.scope][name[1]][1] = "true"
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        if args[1] == "false" and args[2] == "false":
-                            self.temp_frame[name[1]][1] = "false"
-                        else:
-                            self.temp_frame[name[1]][1] = "true"
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #NOT
-            elif self.opcode == "NOT":
-                if type[1] == "var":
-                    name = args[1].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            type[1] = self.global_frame[name[1]][0]
-                            args[1] = self.global_frame[name[1]][1]
-                    if name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        type[1] = self.local_frame[self.scope][name[1]][0]
-                        args[1] = self.local_frame[self.scope][name[1]][1]
-                    if name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        elif name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            type[1] = self.temp_frame[name[1]][0]
-                            args[1] = self.temp_frame[name[1]][1]
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if type[1] != "bool":
-                    exit(53)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "bool"
-                        if args[1] == "true":
-                            self.global_frame[name[1]][1] = "false"
-                        else:
-                            self.global_frame[name[1]][1] = "true"
-                if name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "bool"
-                    if args[1] == "true":
-                        self.local_frame[self.scope][name[1]][1] = "false"
-                    else:
-                        self.local_frame[self.scope][name[1]][1] = "true"
-                if name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "bool"
-                        if args[1] == "true":
-                            self.temp_frame[name[1]][1] = "false"
-                        else:
-                            self.temp_frame[name[1]][1] = "true"
-            #INT2CHAR
-            elif self.opcode == "INT2CHAR":
-                if type[1] == "var":
-                    name = args[1].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            type[1] = self.global_frame[name[1]][0]
-                            args[1] = self.global_frame[name[1]][1]
-                    if name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        type[1] = self.local_frame[self.scope][name[1]][0]
-                        args[1] = self.local_frame[self.scope][name[1]][1]
-                    if name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        elif name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            type[1] = self.temp_frame[name[1]][0]
-                            args[1] = self.temp_frame[name[1]][1]
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if type[1] != "int":
-                    exit(53)
-                try:
-                    args[1] = chr(int(args[1]))
-                except ValueError:
-                    exit(58)
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "string"
-                        self.global_frame[name[1]][1] = args[1]
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "string"
-                    self.local_frame[self.scope][name[1]][1] = args[1]
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "string"
-                        self.temp_frame[name[1]][1] = args[1]
-            #STRI2INT
-            elif self.opcode == "STRI2INT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if type[2] != "int" or type[1] != "string":
-                    if type[1] == None or type[2] == None:
-                        exit(56)
-                    exit(53)
-                args[1] = self.rewrite_string(args[1])
-                try:
-                    index = int(args[2])
-                except ValueError:
-                    exit(58)
-                if index >= len(args[1]) or index < 0:
-                    exit(58)
-                char = args[1][index]
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "int"
-                        self.global_frame[name[1]][1] = ord(char)
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "int"
-                    self.local_frame[self.scope][name[1]][1] = ord(char)
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "int"
-                        self.temp_frame[name[1]][1] = ord(char)
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #READ
-            elif self.opcode == "READ":
-                if self.input_file == sys.stdin:
-                    try:
-                        input_to_read = input()
-                    except EOFError:
-                        input_to_read = ""
-                else:
-                    input_to_read = self.input_file.readline().replace('\n', "")
-                if args[1] == "int":
-                    try:
-                        input_to_read = int(input_to_read)
-                    except:
-                        input_to_read = "nil"
-                        args[1] = "nil"
-                elif args[1] == "bool":
-                    if(input_to_read.lower() == "true"):
-                        input_to_read = "true"
-                    else:
-                        input_to_read = "false"
-                elif args[1] == "string" and input_to_read != None:
-                    input_to_read = re.sub('&lt;', '<', input_to_read)
-                    input_to_read = re.sub('&gt;', '>', input_to_read)
-                    input_to_read = re.sub('&amp;', '&', input_to_read)
-                    input_to_read = re.sub('&quot;', '"', input_to_read)
-                    input_to_read = re.sub('&apos;', '\'', input_to_read)
-                    pattern = r'\\\d{3}'
-                    match = re.search(pattern, input_to_read)
-                    while match:
-                        num = int(match.group()[1:])
-                        char = chr(num)
-                        input_to_read = re.sub(pattern, char, input_to_read, count=1)
-                        match = re.search(pattern, input_to_read)
-                if input_to_read == None:
-                    input_to_read = ""
-                    args[1] = "nil"
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = args[1]
-                        self.global_frame[name[1]][1] = input_to_read
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = args[1]
-                    self.local_frame[self.scope][name[1]][1] = input_to_read
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = args[1]
-                        self.temp_frame[name[1]][1] = input_to_read
-            #WRITE
-            elif self.opcode == "WRITE":
-                if type[0] == "var":
-                    value = args[0]
-                    typ = type[0]
-                    name = args[0].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            type[0] = self.global_frame[name[1]][0]
-                            args[0] = self.global_frame[name[1]][1]
-                    if name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        type[0] = self.local_frame[self.scope][name[1]][0]
-                        args[0] = self.local_frame[self.scope][name[1]][1] 
-                    if name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        elif name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            type[0] = self.temp_frame[name[1]][0]
-                            args[0] = self.temp_frame[name[1]][1]
-                    if args[0] == None:
-                        exit(56)
-                    elif type[0] == "int":
-                        print(int(args[0]), end='')
-                    elif type[0] == "bool":
-                        print(args[0], end='')
-                    elif type[0] == "nil":
-                        print("", end='')
-                    elif type[0] == "string":
-                        input_to_read = self.rewrite_string(args[0])
-                        print(input_to_read, end='')
-                    type[0] = typ
-                    args[0] = value
-                else:
-                    if type[0] == "int":
-                        print(int(args[0]), end='')
-                    elif type[0] == "bool":
-                        print(args[0], end='')
-                    elif type[0] == "nil":
-                        print("", end='')
-                    elif type[0] == "string":
-                        input_to_read = self.rewrite_string(args[0])
-                        print(input_to_read, end='')
-            #CONCAT
-            elif self.opcode == "CONCAT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if type[1] != type[2] or type[1] != "string":
-                    exit(53)
-                else:
-                    name = args[0].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            self.global_frame[name[1]][0] = "string"
-                            self.global_frame[name[1]][1] = args[1] + args[2]
-                    if name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        self.local_frame[self.scope][name[1]][0] = "string"
-                        self.local_frame[self.scope][name[1]][1] = args[1] + args[2]
-                    if name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        elif name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            self.temp_frame[name[1]][0] = "string"
-                            self.temp_frame[name[1]][1] = args[1] + args[2]
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #STRLEN
-            elif self.opcode == "STRLEN":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,2):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if type[1] != "string":
-                    if type[1] == None:
-                        exit(56)
-                    exit(53)
-                else:
-                    name = args[0].split('@')
-                    if name[0] == "GF":
-                        if name[1] not in self.global_frame:
-                            exit(54)
-                        else:
-                            self.global_frame[name[1]][0] = "int"
-                            if args[1] == None:
-                                self.global_frame[name[1]][1] = 0
-                            else:
-                             self.global_frame[name[1]][1] = len(args[1])
-                    if name[0] == "LF":
-                        if not self.lf_exists:
-                            exit(55)
-                        if self.scope in self.local_frame:
-                            if name[1] not in self.local_frame[self.scope]:
-                                exit(54)
-                        else:
-                                exit(54)
-                        self.local_frame[self.scope][name[1]][0] = "int"
-                        if args[1] == None:
-                            self.local_frame[self.scope][name[1]][1] = 0
-                        else:
-                            self.local_frame[self.scope][name[1]][1] = len(args[1])
-                    if name[0] == "TF":
-                        if not self.tf_exists:
-                            exit(55)
-                        elif name[1] not in self.temp_frame:
-                            exit(54)
-                        else:
-                            self.temp_frame[name[1]][0] = "int"
-                            if args[1] == None:
-                                self.temp_frame[name[1]][1] = 0
-                            else:
-                             self.temp_frame[name[1]][1] = len(args[1])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #GETCHAR
-            elif self.opcode == "GETCHAR":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[2] != "int" or type[1] != "string":
-                    exit(53)
-                try:
-                    index = int(args[2])
-                except ValueError:
-                    exit(58)
-                if index >= len(args[1]) or index < 0:
-                    exit(58)
-                char = args[1][index]
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "string"
-                        self.global_frame[name[1]][1] = char
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "string"
-                    self.local_frame[self.scope][name[1]][1] = char
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "string"
-                        self.temp_frame[name[1]][1] = char
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #SETCHAR
-            elif self.opcode == "SETCHAR":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(0,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if 2 not in typ:
-                    if args[2] == None:
-                        exit(58)
-                if args[0] == None:
-                    exit(56)
-                if args[1] == None or type[1] == None:
-                    exit(56)
-                if args[2] == None or type[2] == None:
-                    exit(56)
-                if type[1] != "int" or type[2] != "string" or type[0] != "string":
-                    exit(53)
-                try:
-                    index = int(args[1])
-                except ValueError:
-                    exit(58)
-                if args[0] == None:
-                    exit(56)
-                if int(args[1]) >= len(args[0]) or int(args[1]) < 0:
-                    exit(58)
-                args[2] = self.rewrite_string(args[2])
-                if len(args[2]) == 0:
-                    exit(58)
-                var_list = list(args[0])  # Convert string to list
-                var_list[index] = args[2][0]  # Modify the character at the given index
-                args[0] = "".join(var_list)  # Convert list back to string and update the variable
-                rewrite = args[0]
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "string"
-                        self.global_frame[name[1]][1] = rewrite
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "string"
-                    self.local_frame[self.scope][name[1]][1] = rewrite
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "string"
-                        self.temp_frame[name[1]][1] = rewrite
-            #TYPE
-            elif self.opcode == "TYPE":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,2):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value1 = self.getfromvar(args,type,i,typ,value)
-                if type[1] == None:
-                    value = ""
-                else:
-                    value = type[1]
-                name = args[0].split('@')
-                if name[0] == "GF":
-                    if name[1] not in self.global_frame:
-                        exit(54)
-                    else:
-                        self.global_frame[name[1]][0] = "string"
-                        self.global_frame[name[1]][1] = value
-                elif name[0] == "LF":
-                    if not self.lf_exists:
-                        exit(55)
-                    if self.scope in self.local_frame:
-                        if name[1] not in self.local_frame[self.scope]:
-                            exit(54)
-                    else:
-                        exit(54)
-                    self.local_frame[self.scope][name[1]][0] = "string"
-                    self.local_frame[self.scope][name[1]][1] = value
-                elif name[0] == "TF":
-                    if not self.tf_exists:
-                        exit(55)
-                    elif name[1] not in self.temp_frame:
-                        exit(54)
-                    else:
-                        self.temp_frame[name[1]][0] = "string"
-                        self.temp_frame[name[1]][1] = value
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value1[k]
-            #LABEL
-            elif self.opcode == "LABEL":
-                pass
-            #JUMP
-            elif self.opcode == "JUMP":
-                if args[0] not in self.label_dict:
+        # initialize the index of the current instruction
+        self.count = 0
+        # bind every opcode id to its handler once, before the first instruction runs
+        handlers = self.build_dispatch_table()
+        program = self.program
+        try:
+            # iterate through each instruction
+            while self.count < len(program):
+                # retrieve the current instruction and run the handler of its opcode
+                opcode, args, type = program[self.count]
+                handlers[opcode](args, type)
+                # increment the count
+                self.count += 1
+        except InstructionError as error:
+            exit(error.code)
+        finally:
+            # the buffered output is written at the end of the program and also when EXIT or an error ends it
+            self.output.flush()
+
+    # Method to build a list of handler methods indexed by opcode id (e.g. the id of "ADD" -> self.op_add)
+    def build_dispatch_table(self):
+        return [getattr(self, "op_" + opcode.lower()) for opcode in OPCODES]
+
+    #CREATEFRAME
+    def op_createframe(self, args, type):
+        self.temp_frame = {}
+    #PUSHFRAME
+    def op_pushframe(self, args, type):
+        # the temporary frame itself becomes the local frame, nothing is copied
+        if self.temp_frame is None:
+            exit(55)
+        self.frame_stack.append(self.temp_frame)
+        self.temp_frame = None
+    #POPFRAME
+    def op_popframe(self, args, type):
+        if not self.frame_stack:
+            exit(55)
+        self.temp_frame = self.frame_stack.pop()
+    #RETURN
+    def op_return(self, args, type):
+        if len(self.call_stack) == 0:
+            exit(56)
+        self.count = self.call_stack.pop()
+    #BREAK
+    def op_break(self, args, type):
+        global_frame = {self.global_names[slot]: self.to_debug(value) for slot, value in enumerate(self.global_frame) if value is not None}
+        local_frame = {name: self.to_debug(value) for name, value in (self.frame_stack[-1] if self.frame_stack else {}).items()}
+        temp_frame = {name: self.to_debug(value) for name, value in (self.temp_frame or {}).items()}
+        # flush the standard output first, so the state is printed after everything written before it
+        self.output.flush()
+        print('The position in the code : {}'.format(self.count + 1), file=sys.stderr)
+        print('Global frame : {}'.format(global_frame), file=sys.stderr)
+        print('Local frame : {}'.format(local_frame), file=sys.stderr)
+        print('Temporary frame : {}'.format(temp_frame), file=sys.stderr)
+        print('The number of instructions being executed:{}'.format(self.count+1), file=sys.stderr)
+    #CLEARS
+    def op_clears(self, args, type):
+        # the stack list is kept, so the compiling backends may hold a reference to it
+        self.stack.clear()
+    #ADDS
+    def op_adds(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = add(value1, value2)
+    #SUBS
+    def op_subs(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = sub(value1, value2)
+    #MULS
+    def op_muls(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = mul(value1, value2)
+    #IDIVS
+    def op_idivs(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = idiv(value1, value2)
+    #LTS
+    def op_lts(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = lt(value1, value2)
+    #GTS
+    def op_gts(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = gt(value1, value2)
+    #EQS
+    def op_eqs(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = eq(value1, value2)
+    #ANDS
+    def op_ands(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = logical_and(value1, value2)
+    #ORS
+    def op_ors(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = logical_or(value1, value2)
+    #NOTS
+    def op_nots(self, args, type):
+        if not self.stack:
+            exit(56)
+        self.stack[-1] = logical_not(self.stack[-1])
+    #INT2CHARS
+    def op_int2chars(self, args, type):
+        if not self.stack:
+            exit(56)
+        self.stack[-1] = int2char(self.stack[-1])
+    #STRI2INTS
+    def op_stri2ints(self, args, type):
+        value1, value2 = self.top_operands()
+        self.stack[-1] = stri2int(value1, value2)
+    #JUMPIFEQS
+    def op_jumpifeqs(self, args, type):
+        value1, value2 = self.pop_operands()
+        if values_equal(value1, value2):
+            self.count = args[0]
+    #JUMPIFNEQS
+    def op_jumpifneqs(self, args, type):
+        value1, value2 = self.pop_operands()
+        if not values_equal(value1, value2):
+            self.count = args[0]
+    # Method to pop the two operands of a stack instruction, the second operand is on top of the stack
+    def pop_operands(self):
+        if len(self.stack) < 2:
+            exit(56)
+        value2 = self.stack.pop()
+        value1 = self.stack.pop()
+        return value1, value2
+    # Method to return the two operands of a stack instruction that pushes a result, only the second operand is popped,
+    # the first one stays on top of the stack and the handler replaces it with the result
+    def top_operands(self):
+        stack = self.stack
+        if len(stack) < 2:
+            exit(56)
+        value2 = stack.pop()
+        return stack[-1], value2
+    #DEFVAR
+    def op_defvar(self, args, type):
+        frame, name = args[0]
+        if frame == "GF":
+            if self.global_frame[name] is not None:
+                exit(52)
+            self.global_frame[name] = UNINITIALIZED
+        elif frame == "TF":
+            if self.temp_frame is None:
+                exit(55)
+            if name in self.temp_frame:
+                exit(52)
+            self.temp_frame[name] = UNINITIALIZED
+        else:
+            if not self.frame_stack:
+                exit(55)
+            if name in self.frame_stack[-1]:
+                exit(52)
+            self.frame_stack[-1][name] = UNINITIALIZED
+    #POPS
+    def op_pops(self, args, type):
+        if not self.stack:
+            exit(56)
+        self.set_var(args[0], self.stack.pop())
+    #PUSHS
+    def op_pushs(self, args, type):
+        symb = self.get_symb(args[0], type[0])
+        if symb[0] is None:
+            exit(56)
+        if symb[1].__class__ is StringBuffer:
+            symb = (STRING, str(symb[1]))
+        self.stack.append(symb)
+    #MOVE
+    def op_move(self, args, type):
+        symb = self.get_symb(args[1], type[1])
+        if symb[0] is None:
+            exit(56)
+        if symb[1].__class__ is StringBuffer:
+            symb = (STRING, str(symb[1]))
+        self.set_var(args[0], symb)
+    #CALL
+    def op_call(self, args, type):
+        self.push_call(self.count)
+        self.count = args[0]
+    # Method to push the index of a CALL instruction onto the call stack, RETURN continues after it
+    def push_call(self, index):
+        if len(self.call_stack) >= self.max_call_depth:
+            exit(CALL_DEPTH_EXIT_CODE)
+        self.call_stack.append(index)
+        if len(self.call_stack) > self.peak_call_depth:
+            self.peak_call_depth = len(self.call_stack)
+    #ADD
+    def op_add(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], add(symb1, symb2))
+    #SUB
+    def op_sub(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], sub(symb1, symb2))
+    #MUL
+    def op_mul(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], mul(symb1, symb2))
+    #IDIV
+    def op_idiv(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], idiv(symb1, symb2))
+    #LT
+    def op_lt(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], lt(symb1, symb2))
+    #GT
+    def op_gt(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], gt(symb1, symb2))
+    #EQ
+    def op_eq(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], eq(symb1, symb2))
+    #AND
+    def op_and(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], logical_and(symb1, symb2))
+    #OR
+    def op_or(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], logical_or(symb1, symb2))
+    #NOT
+    def op_not(self, args, type):
+        symb = self.get_symb(args[1], type[1])
+        if symb[0] is None:
+            exit(56)
+        self.set_var(args[0], logical_not(symb))
+    #INT2CHAR
+    def op_int2char(self, args, type):
+        symb = self.get_symb(args[1], type[1])
+        if symb[0] is None:
+            exit(56)
+        self.set_var(args[0], int2char(symb))
+    #STRI2INT
+    def op_stri2int(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], stri2int(symb1, symb2))
+    #READ
+    def op_read(self, args, type):
+        read_type = args[1]
+        input_to_read = self.input_file.readline()
+        # the end of the input reads as an empty line
+        if input_to_read is None:
+            input_to_read = ""
+        if read_type is INT:
+            try:
+                value = (INT, int(input_to_read))
+            except ValueError:
+                value = NIL_VALUE
+        elif read_type is BOOL:
+            value = TRUE if input_to_read.lower() == "true" else FALSE
+        else:
+            value = (STRING, rewrite_string(input_to_read))
+        self.set_var(args[0], value)
+    #WRITE
+    def op_write(self, args, type):
+        symb = self.get_symb(args[0], type[0])
+        if symb[0] is None:
+            exit(56)
+        self.output.write(self.to_output(symb))
+    #CONCAT
+    def op_concat(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], concat_strings(symb1, symb2))
+    #STRLEN
+    def op_strlen(self, args, type):
+        symb = self.get_symb(args[1], type[1])
+        if symb[0] is None:
+            exit(56)
+        self.set_var(args[0], strlen(symb))
+    #GETCHAR
+    def op_getchar(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        self.set_var(args[0], getchar(symb1, symb2))
+    #SETCHAR
+    def op_setchar(self, args, type):
+        string = self.get_var(args[0])
+        symb1, symb2 = self.get_operands(args, type)
+        if string[0] is None:
+            exit(56)
+        if string[0] is not STRING or symb1[0] is not INT or symb2[0] is not STRING:
+            exit(53)
+        index = symb1[1]
+        if index >= len(string[1]) or index < 0:
+            exit(58)
+        char = symb2[1]
+        if len(char) == 0:
+            exit(58)
+        # The first SETCHAR of a string makes the variable hold a buffer, the next ones change it in place
+        buffer = string[1]
+        if buffer.__class__ is not StringBuffer:
+            buffer = StringBuffer(str(buffer))
+            self.set_var(args[0], (STRING, buffer))
+        buffer[index] = char[0]
+    #TYPE
+    def op_type(self, args, type):
+        self.set_var(args[0], type_name(self.get_symb(args[1], type[1])))
+    #LABEL
+    def op_label(self, args, type):
+        pass
+    #JUMP
+    def op_jump(self, args, type):
+        self.count = args[0]
+    #JUMPIFEQ
+    def op_jumpifeq(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        if values_equal(symb1, symb2):
+            self.count = args[0]
+    #JUMPIFNEQ
+    def op_jumpifneq(self, args, type):
+        symb1, symb2 = self.get_operands(args, type)
+        if not values_equal(symb1, symb2):
+            self.count = args[0]
+    # Method to read the two operands of a PUSH_*_POP superinstruction in the order the PUSHS instructions would
+    def get_pushed_operands(self, args, type):
+        symb1 = self.get_symb(args[1], type[1])
+        if symb1[0] is None:
+            exit(56)
+        symb2 = self.get_symb(args[2], type[2])
+        if symb2[0] is None:
+            exit(56)
+        return symb1, symb2
+    #PUSHS PUSHS ADDS POPS
+    def op_push_add_pop(self, args, type):
+        symb1, symb2 = self.get_pushed_operands(args, type)
+        self.set_var(args[0], add(symb1, symb2))
+    #PUSHS PUSHS SUBS POPS
+    def op_push_sub_pop(self, args, type):
+        symb1, symb2 = self.get_pushed_operands(args, type)
+        self.set_var(args[0], sub(symb1, symb2))
+    #PUSHS PUSHS MULS POPS
+    def op_push_mul_pop(self, args, type):
+        symb1, symb2 = self.get_pushed_operands(args, type)
+        self.set_var(args[0], mul(symb1, symb2))
+    #PUSHS PUSHS IDIVS POPS
+    def op_push_idiv_pop(self, args, type):
+        symb1, symb2 = self.get_pushed_operands(args, type)
+        self.set_var(args[0], idiv(symb1, symb2))
+    # Method to run the MOVE of a MOVE_JUMPIF* superinstruction and return its jump operands
+    def move_before_jump(self, args, type):
+        symb = self.get_symb(args[2], type[2])
+        if symb[0] is None:
+            exit(56)
+        if symb[1].__class__ is StringBuffer:
+            symb = (STRING, str(symb[1]))
+        self.set_var(args[1], symb)
+        symb1 = self.get_symb(args[3], type[3])
+        symb2 = self.get_symb(args[4], type[4])
+        if symb1[0] is None or symb2[0] is None:
+            exit(56)
+        return symb1, symb2
+    #MOVE JUMPIFEQ
+    def op_move_jumpifeq(self, args, type):
+        symb1, symb2 = self.move_before_jump(args, type)
+        if values_equal(symb1, symb2):
+            self.count = args[0]
+    #MOVE JUMPIFNEQ
+    def op_move_jumpifneq(self, args, type):
+        symb1, symb2 = self.move_before_jump(args, type)
+        if not values_equal(symb1, symb2):
+            self.count = args[0]
+    # Method to read both operands of an instruction whose operand types were proven when the program was loaded,
+    # a variable operand is a global variable that surely holds a value
+    def get_typed_operands(self, args, type):
+        value1 = self.global_frame[args[1][1]][1] if type[1] == "var" else args[1][1]
+        value2 = self.global_frame[args[2][1]][1] if type[2] == "var" else args[2][1]
+        return value1, value2
+    #ADD of proven ints
+    def op_add_int(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], (INT, value1 + value2))
+    #SUB of proven ints
+    def op_sub_int(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], (INT, value1 - value2))
+    #MUL of proven ints
+    def op_mul_int(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], (INT, value1 * value2))
+    #IDIV of proven ints
+    def op_idiv_int(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        if value2 == 0:
+            exit(57)
+        self.set_var(args[0], (INT, value1 // value2))
+    #LT of proven operands of the same type
+    def op_lt_typed(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], TRUE if value1 < value2 else FALSE)
+    #GT of proven operands of the same type
+    def op_gt_typed(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], TRUE if value1 > value2 else FALSE)
+    #EQ of proven operands of the same type
+    def op_eq_typed(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], TRUE if value1 == value2 else FALSE)
+    #CONCAT of proven strings
+    def op_concat_string(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        self.set_var(args[0], (STRING, concat(value1, value2)))
+    #JUMPIFEQ of proven operands of the same type
+    def op_jumpifeq_typed(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        if value1 == value2:
+            self.count = args[0]
+    #JUMPIFNEQ of proven operands of the same type
+    def op_jumpifneq_typed(self, args, type):
+        value1, value2 = self.get_typed_operands(args, type)
+        if value1 != value2:
+            self.count = args[0]
+    #EXIT
+    def op_exit(self, args, type):
+        symb = self.get_symb(args[0], type[0])
+        if symb[0] is None:
+            exit(56)
+        if symb[0] is not INT:
+            exit(53)
+        elif symb[1] > 49 or symb[1] < 0:
+            exit(57)
+        else:
+            exit(symb[1])
+    #DPRINT
+    def op_dprint(self, args, type):
+        symb = self.get_symb(args[0], type[0])
+        self.output.flush()
+        print(self.to_output(symb), file=sys.stderr)
+class ClosureInterpret(Interpret):
+    # Backend compiling every instruction into a closure with its operands already resolved,
+    # each closure runs one instruction and returns the index of the next one
+    def interpret(self):
+        self.count = 0
+        code = [self.compile_instruction(index, opcode, args, types) for index, (opcode, args, types) in enumerate(self.program)]
+        end = len(code)
+        index = 0
+        try:
+            while index < end:
+                index = code[index]()
+        except InstructionError as error:
+            exit(error.code)
+        finally:
+            self.output.flush()
+
+    # Method to return the closure of one instruction, opcodes without a compile_ method run their op_ handler
+    def compile_instruction(self, index, opcode, args, types):
+        if OPCODES[opcode] in TYPED_INSTRUCTIONS:
+            return self.compile_typed(index + 1, OPCODES[opcode], args, types)
+        compile_method = getattr(self, "compile_" + OPCODES[opcode].lower(), None)
+        if compile_method is not None:
+            return compile_method(index + 1, args, types)
+        handler = getattr(self, "op_" + OPCODES[opcode].lower())
+        def run():
+            # the handlers read and change the index through self.count
+            self.count = index
+            handler(args, types)
+            return self.count + 1
+        return run
+
+    # Method to return a function reading a symbol, constants are returned without looking anything up
+    def symbol_getter(self, arg, type):
+        if type != "var":
+            return lambda: arg
+        frame, name = arg
+        if frame == "GF":
+            global_frame = self.global_frame
+            def get_global():
+                value = global_frame[name]
+                if value is None:
                     exit(54)
-                else:
-                    count = self.label_dict[args[0]]
-            #JUMPIFEQ
-            elif self.opcode == "JUMPIFEQ":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if args[0] not in self.label_dict:
-                    exit(52)
-                else:
-                    if (type[1] == type[2]):
-                        if type[1] == "int":
-                            value1 = int(args[1])
-                            value2 = int(args[2])
-                        else:
-                            if type[1] == "string":
-                                args[1] = self.rewrite_string(args[1])
-                                args[2] = self.rewrite_string(args[2])
-                            value1 = args[1]
-                            value2 = args[2]
-                        if (value1 == value2):
-                            count = self.label_dict[args[0]]
-                    elif type[1] != "nil" and type[2] != "nil":
-                        exit(53)
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #JUMPIFNEQ
-            elif self.opcode == "JUMPIFNEQ":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,3):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[1] == None:
-                    if type[1] == None:
-                        exit(56)
-                    args[1] = ""
-                if args[2] == None:
-                    if type[2] == None:
-                        exit(56)
-                    args[2] = ""
-                if args[0] not in self.label_dict:
-                    exit(52)
-                else:
-                    if (type[1] == type[2]) or type[1] == "nil" or type[2] == "nil":
-                        if type[1] == "int" and type[2] == "int":
-                            value1 = int(args[1])
-                            value2 = int(args[2])
-                        else:
-                            if type[1] == "string":
-                                args[1] = self.rewrite_string(args[1])
-                                args[2] = self.rewrite_string(args[2])
-                            value1 = args[1]
-                            value2 = args[2]
-                        if (value1 != value2):
-                            count = self.label_dict[args[0]]
-                    elif type[1] != "nil" and type[2] != "nil":
-                        exit(53)
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #EXIT
-            elif self.opcode == "EXIT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(0,1):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[0] == None:
-                    exit(56)
-                if type[0] != "int":
-                    exit(53)
-                elif int(args[0]) > 49 or int(args[0]) < 0:
+                return value
+            return get_global
+        return lambda: self.get_var(arg)
+
+    # Method to return a function storing a value into a variable
+    def variable_setter(self, arg):
+        frame, name = arg
+        if frame == "GF":
+            global_frame = self.global_frame
+            def set_global(value):
+                if global_frame[name] is None:
+                    exit(54)
+                global_frame[name] = value
+            return set_global
+        return lambda value: self.set_var(arg, value)
+
+    # Method to return the closure of an unchecked variant, its operands surely have values of the right types
+    def compile_typed(self, next_index, name, args, types):
+        getters = []
+        for arg, type in zip(args[1:], types[1:]):
+            if type == "var":
+                getters.append(lambda slot=arg[1], global_frame=self.global_frame: global_frame[slot][1])
+            else:
+                getters.append(lambda value=arg[1]: value)
+        get1, get2 = getters
+        base = TYPED_INSTRUCTIONS[name]
+        if base in ["JUMPIFEQ", "JUMPIFNEQ"]:
+            target = args[0] + 1
+            jump_if = base == "JUMPIFEQ"
+            return lambda: target if (get1() == get2()) == jump_if else next_index
+        store = self.variable_setter(args[0])
+        if base == "IDIV":
+            def run():
+                value2 = get2()
+                value1 = get1()
+                if value2 == 0:
                     exit(57)
-                elif args[0] == "":
-                    exit(56)
-                else:
-                    exit(int(args[0]))
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-            #DPRINT
-            elif self.opcode == "DPRINT":
-                help_stack = []
-                typ = {}
-                value = {}
-                for i in range(1,2):
-                    if type[i] == "var":
-                        help_stack.append(i)
-                        typ, value = self.getfromvar(args,type,i,typ,value)
-                if args[0] == None:
-                    print("")
-                else:
-                    print(args[0])
-                for k in help_stack:
-                    type[k] = typ[k]
-                    args[k] = value[k]
-             # increment the count
-            count += 1
+                store((INT, value1 // value2))
+                return next_index
+            return run
+        if base in ["ADD", "SUB", "MUL", "CONCAT"]:
+            operation = {"ADD": operator.add, "SUB": operator.sub, "MUL": operator.mul, "CONCAT": concat}[base]
+            result_type = STRING if base == "CONCAT" else INT
+            def run():
+                store((result_type, operation(get1(), get2())))
+                return next_index
+            return run
+        operation = {"LT": operator.lt, "GT": operator.gt, "EQ": operator.eq}[base]
+        def run():
+            store(TRUE if operation(get1(), get2()) else FALSE)
+            return next_index
+        return run
+
+    # Method to return the closure of an instruction computing an int from two int operands
+    def compile_arithmetic(self, next_index, args, types, operation, divides=False):
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        store = self.variable_setter(args[0])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            if symb1[0] is not INT or symb2[0] is not INT:
+                exit(53)
+            if divides and symb2[1] == 0:
+                exit(57)
+            store((INT, operation(symb1[1], symb2[1])))
+            return next_index
+        return run
+
+    # Method to return the closure of LT or GT
+    def compile_relation(self, next_index, args, types, operation):
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        store = self.variable_setter(args[0])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            if symb1[0] is not symb2[0] or symb1[0] is NIL:
+                exit(53)
+            store(TRUE if operation(symb1[1], symb2[1]) else FALSE)
+            return next_index
+        return run
+
+    # Method to return the closure of a conditional jump, it jumps when the equality of the operands is equal to jump_if
+    def compile_conditional_jump(self, next_index, args, types, jump_if):
+        target = args[0] + 1
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            if values_equal(symb1, symb2) == jump_if:
+                return target
+            return next_index
+        return run
+
+    #MOVE
+    def compile_move(self, next_index, args, types):
+        get = self.symbol_getter(args[1], types[1])
+        store = self.variable_setter(args[0])
+        def run():
+            symb = get()
+            if symb[0] is None:
+                exit(56)
+            if symb[1].__class__ is StringBuffer:
+                symb = (STRING, str(symb[1]))
+            store(symb)
+            return next_index
+        return run
+    #ADD
+    def compile_add(self, next_index, args, types):
+        return self.compile_arithmetic(next_index, args, types, operator.add)
+    #SUB
+    def compile_sub(self, next_index, args, types):
+        return self.compile_arithmetic(next_index, args, types, operator.sub)
+    #MUL
+    def compile_mul(self, next_index, args, types):
+        return self.compile_arithmetic(next_index, args, types, operator.mul)
+    #IDIV
+    def compile_idiv(self, next_index, args, types):
+        return self.compile_arithmetic(next_index, args, types, operator.floordiv, divides=True)
+    #LT
+    def compile_lt(self, next_index, args, types):
+        return self.compile_relation(next_index, args, types, operator.lt)
+    #GT
+    def compile_gt(self, next_index, args, types):
+        return self.compile_relation(next_index, args, types, operator.gt)
+    #EQ
+    def compile_eq(self, next_index, args, types):
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        store = self.variable_setter(args[0])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            store(TRUE if values_equal(symb1, symb2) else FALSE)
+            return next_index
+        return run
+    #CONCAT
+    def compile_concat(self, next_index, args, types):
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        store = self.variable_setter(args[0])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            if symb1[0] is not STRING or symb2[0] is not STRING:
+                exit(53)
+            store((STRING, concat(symb1[1], symb2[1])))
+            return next_index
+        return run
+    #STRLEN
+    def compile_strlen(self, next_index, args, types):
+        get = self.symbol_getter(args[1], types[1])
+        store = self.variable_setter(args[0])
+        def run():
+            symb = get()
+            if symb[0] is None:
+                exit(56)
+            if symb[0] is not STRING:
+                exit(53)
+            store((INT, len(symb[1])))
+            return next_index
+        return run
+    #GETCHAR
+    def compile_getchar(self, next_index, args, types):
+        get1 = self.symbol_getter(args[1], types[1])
+        get2 = self.symbol_getter(args[2], types[2])
+        store = self.variable_setter(args[0])
+        def run():
+            symb1 = get1()
+            symb2 = get2()
+            if symb1[0] is None or symb2[0] is None:
+                exit(56)
+            if symb1[0] is not STRING or symb2[0] is not INT:
+                exit(53)
+            index = symb2[1]
+            if index >= len(symb1[1]) or index < 0:
+                exit(58)
+            store((STRING, symb1[1][index]))
+            return next_index
+        return run
+    #WRITE
+    def compile_write(self, next_index, args, types):
+        get = self.symbol_getter(args[0], types[0])
+        write = self.output.write
+        to_output = self.to_output
+        def run():
+            symb = get()
+            if symb[0] is None:
+                exit(56)
+            write(to_output(symb))
+            return next_index
+        return run
+    #PUSHS
+    def compile_pushs(self, next_index, args, types):
+        get = self.symbol_getter(args[0], types[0])
+        push = self.stack.append
+        def run():
+            symb = get()
+            if symb[0] is None:
+                exit(56)
+            if symb[1].__class__ is StringBuffer:
+                symb = (STRING, str(symb[1]))
+            push(symb)
+            return next_index
+        return run
+    #POPS
+    def compile_pops(self, next_index, args, types):
+        stack = self.stack
+        store = self.variable_setter(args[0])
+        def run():
+            if not stack:
+                exit(56)
+            store(stack.pop())
+            return next_index
+        return run
+
+    # Method to return the closure of a stack instruction computing an int from two int operands,
+    # the second operand is popped and the result replaces the first one on top of the stack
+    def compile_stack_arithmetic(self, next_index, operation, divides=False):
+        stack = self.stack
+        def run():
+            if len(stack) < 2:
+                exit(56)
+            value2 = stack.pop()
+            value1 = stack[-1]
+            if value1[0] is not INT or value2[0] is not INT:
+                exit(53)
+            if divides and value2[1] == 0:
+                exit(57)
+            stack[-1] = (INT, operation(value1[1], value2[1]))
+            return next_index
+        return run
+
+    # Method to return the closure of LTS or GTS
+    def compile_stack_relation(self, next_index, operation):
+        stack = self.stack
+        def run():
+            if len(stack) < 2:
+                exit(56)
+            value2 = stack.pop()
+            value1 = stack[-1]
+            if value1[0] is not value2[0] or value1[0] is NIL:
+                exit(53)
+            stack[-1] = TRUE if operation(value1[1], value2[1]) else FALSE
+            return next_index
+        return run
+
+    # Method to return the closure of JUMPIFEQS or JUMPIFNEQS
+    def compile_stack_jump(self, next_index, args, jump_if):
+        stack = self.stack
+        target = args[0] + 1
+        def run():
+            if len(stack) < 2:
+                exit(56)
+            value2 = stack.pop()
+            value1 = stack.pop()
+            if values_equal(value1, value2) == jump_if:
+                return target
+            return next_index
+        return run
+    #ADDS
+    def compile_adds(self, next_index, args, types):
+        return self.compile_stack_arithmetic(next_index, operator.add)
+    #SUBS
+    def compile_subs(self, next_index, args, types):
+        return self.compile_stack_arithmetic(next_index, operator.sub)
+    #MULS
+    def compile_muls(self, next_index, args, types):
+        return self.compile_stack_arithmetic(next_index, operator.mul)
+    #IDIVS
+    def compile_idivs(self, next_index, args, types):
+        return self.compile_stack_arithmetic(next_index, operator.floordiv, divides=True)
+    #LTS
+    def compile_lts(self, next_index, args, types):
+        return self.compile_stack_relation(next_index, operator.lt)
+    #GTS
+    def compile_gts(self, next_index, args, types):
+        return self.compile_stack_relation(next_index, operator.gt)
+    #EQS
+    def compile_eqs(self, next_index, args, types):
+        stack = self.stack
+        def run():
+            if len(stack) < 2:
+                exit(56)
+            value2 = stack.pop()
+            stack[-1] = TRUE if values_equal(stack[-1], value2) else FALSE
+            return next_index
+        return run
+    #JUMPIFEQS
+    def compile_jumpifeqs(self, next_index, args, types):
+        return self.compile_stack_jump(next_index, args, True)
+    #JUMPIFNEQS
+    def compile_jumpifneqs(self, next_index, args, types):
+        return self.compile_stack_jump(next_index, args, False)
+    #LABEL
+    def compile_label(self, next_index, args, types):
+        return lambda: next_index
+    #JUMP
+    def compile_jump(self, next_index, args, types):
+        target = args[0] + 1
+        return lambda: target
+    #JUMPIFEQ
+    def compile_jumpifeq(self, next_index, args, types):
+        return self.compile_conditional_jump(next_index, args, types, True)
+    #JUMPIFNEQ
+    def compile_jumpifneq(self, next_index, args, types):
+        return self.compile_conditional_jump(next_index, args, types, False)
+class PythonInterpret(Interpret):
+    # Backend translating the program to Python source, every basic block of the control flow graph becomes
+    # a function returning the index of the instruction that starts the next block and a loop dispatches over these indexes
+    def interpret(self):
+        self.count = 0
+        namespace = {"INT": INT, "BOOL": BOOL, "STRING": STRING, "NIL": NIL, "TRUE": TRUE, "FALSE": FALSE, "exit": exit, "concat": concat,
+                     "StringBuffer": StringBuffer, "values_equal": values_equal}
+        exec(compile(self.generate_source(), "<ippcode23>", "exec"), namespace)
+        blocks = namespace["build"](self, self.program, self.constants)
+        end = len(self.program)
+        index = 0
+        try:
+            while index < end:
+                index = blocks[index]()
+        except InstructionError as error:
+            exit(error.code)
+        finally:
+            self.output.flush()
+
+    # Method to return the source of the generated module, its build function binds the interpreter state and the constants
+    # to globals of the module and returns the list of block functions indexed by their first instruction
+    def generate_source(self):
+        self.constants = []
+        program = self.program
+        graph = ControlFlowGraph(program)
+        # the blocks are module level functions reading globals, blocks nested in build would close over every name
+        # of build and compiling them would take time quadratic in the size of the program
+        body = []
+        for block in graph.blocks:
+            body.append("def block_{}():".format(block.start))
+            for index in range(block.start, block.stop):
+                opcode, args, types = program[index]
+                body.append("    # {} {}".format(index, OPCODES[opcode]))
+                body.extend("    " + line for line in self.generate_instruction(index, opcode, args, types))
+            body.append("    return {}".format(block.stop))
+        lines = ["def build(interpreter, instructions, constants):",
+                 "    global self, program, gf, get_var, set_var, to_output, write, stack, handlers",
+                 "    self = interpreter",
+                 "    program = instructions",
+                 "    gf = self.global_frame",
+                 "    get_var = self.get_var",
+                 "    set_var = self.set_var",
+                 "    to_output = self.to_output",
+                 "    write = self.output.write",
+                 "    stack = self.stack",
+                 "    handlers = self.build_dispatch_table()",
+                 "    globals().update((\"c{}\".format(number), value) for number, value in enumerate(constants))",
+                 "    blocks = [None] * {}".format(len(program) + 1)]
+        lines.extend("    blocks[{0}] = block_{0}".format(block.start) for block in graph.blocks)
+        lines.append("    return blocks")
+        lines.extend(body)
+        return "\n".join(lines) + "\n"
+
+    # Method to return the name of a constant that is passed to the generated code
+    def constant(self, value):
+        self.constants.append(value)
+        return "c{}".format(len(self.constants) - 1)
+
+    # Method to return the lines reading a symbol into the local variable name,
+    # the type check of a constant is decided here, so it is only generated for variables
+    def load_symbol(self, arg, type, name):
+        if type != "var":
+            return ["{} = {}".format(name, self.constant(arg))]
+        if arg[0] == "GF":
+            return ["{} = gf[{}]".format(name, arg[1]), "if {} is None:".format(name), "    exit(54)"]
+        return ["{} = get_var({})".format(name, self.constant(arg))]
+
+    # Method to return the lines storing the expression into a variable
+    def store_variable(self, arg, expression):
+        if arg[0] == "GF":
+            return ["if gf[{}] is None:".format(arg[1]), "    exit(54)", "gf[{}] = {}".format(arg[1], expression)]
+        return ["set_var({}, {})".format(self.constant(arg), expression)]
+
+    # Method to return the lines checking that the loaded symbols have a value and their types fit,
+    # expected holds the required type of every symbol or None if any type is accepted
+    def check_symbols(self, args, types, names, expected):
+        lines = []
+        defined = ["{}[0] is None".format(name) for arg, type, name in zip(args, types, names) if type == "var"]
+        if defined:
+            lines += ["if {}:".format(" or ".join(defined)), "    exit(56)"]
+        wrong = []
+        for arg, type, name, required in zip(args, types, names, expected):
+            if required is None:
+                continue
+            if type == "var":
+                wrong.append("{}[0] is not {}".format(name, required.name))
+            elif arg[0] is not required:
+                wrong.append("True")
+        if wrong:
+            lines += ["if {}:".format(" or ".join(wrong)), "    exit(53)"]
+        return lines
+
+    # Method to return the lines of an instruction with two symbols, e.g. ADD, CONCAT or JUMPIFEQ
+    def load_two_symbols(self, args, types, expected):
+        return (self.load_symbol(args[1], types[1], "a") + self.load_symbol(args[2], types[2], "b")
+                + self.check_symbols(args[1:], types[1:], ["a", "b"], expected))
+
+    # Method to return the lines replacing a string buffer loaded from a variable into a by a str, before a is stored
+    def copy_buffer(self, type):
+        if type != "var":
+            return []
+        return ["if a[1].__class__ is StringBuffer:", "    a = (STRING, str(a[1]))"]
+
+    # Method to return the lines of an unchecked variant, its operands surely have values of the right types
+    def generate_typed_instruction(self, name, args, types):
+        operands = []
+        for arg, type in zip(args[1:], types[1:]):
+            operands.append("gf[{}][1]".format(arg[1]) if type == "var" else "{}[1]".format(self.constant(arg)))
+        lines = ["a = {}".format(operands[0]), "b = {}".format(operands[1])]
+        base = TYPED_INSTRUCTIONS[name]
+        if base in ["JUMPIFEQ", "JUMPIFNEQ"]:
+            return lines + ["if a {} b:".format("==" if base == "JUMPIFEQ" else "!="), "    return {}".format(args[0])]
+        if base == "IDIV":
+            lines += ["if b == 0:", "    exit(57)"]
+        expression = {"ADD": "(INT, a + b)", "SUB": "(INT, a - b)", "MUL": "(INT, a * b)", "IDIV": "(INT, a // b)",
+                      "LT": "TRUE if a < b else FALSE", "GT": "TRUE if a > b else FALSE", "EQ": "TRUE if a == b else FALSE",
+                      "CONCAT": "(STRING, concat(a, b))"}[base]
+        return lines + self.store_variable(args[0], expression)
+
+    # Method to return the lines of one instruction, opcodes without a generator call their op_ handler
+    def generate_instruction(self, index, opcode, args, types):
+        name = OPCODES[opcode]
+        if name in TYPED_INSTRUCTIONS:
+            return self.generate_typed_instruction(name, args, types)
+        if name in ["ADD", "SUB", "MUL", "IDIV"]:
+            lines = self.load_two_symbols(args, types, [INT, INT])
+            if name == "IDIV":
+                lines += ["if b[1] == 0:", "    exit(57)"]
+            operator = {"ADD": "+", "SUB": "-", "MUL": "*", "IDIV": "//"}[name]
+            return lines + self.store_variable(args[0], "(INT, a[1] {} b[1])".format(operator))
+        if name in ["LT", "GT"]:
+            lines = self.load_two_symbols(args, types, [None, None])
+            lines += ["if a[0] is not b[0] or a[0] is NIL:", "    exit(53)"]
+            return lines + self.store_variable(args[0], "TRUE if a[1] {} b[1] else FALSE".format("<" if name == "LT" else ">"))
+        if name == "EQ":
+            return self.load_two_symbols(args, types, [None, None]) + self.store_variable(args[0], "TRUE if values_equal(a, b) else FALSE")
+        if name in ["AND", "OR"]:
+            lines = self.load_two_symbols(args, types, [BOOL, BOOL])
+            return lines + self.store_variable(args[0], "TRUE if a[1] {} b[1] else FALSE".format(name.lower()))
+        if name == "CONCAT":
+            return self.load_two_symbols(args, types, [STRING, STRING]) + self.store_variable(args[0], "(STRING, concat(a[1], b[1]))")
+        if name == "GETCHAR":
+            lines = self.load_two_symbols(args, types, [STRING, INT])
+            lines += ["if b[1] >= len(a[1]) or b[1] < 0:", "    exit(58)"]
+            return lines + self.store_variable(args[0], "(STRING, a[1][b[1]])")
+        if name in ["JUMPIFEQ", "JUMPIFNEQ"]:
+            lines = self.load_two_symbols(args, types, [None, None])
+            return lines + ["if {}values_equal(a, b):".format("" if name == "JUMPIFEQ" else "not "), "    return {}".format(args[0])]
+        if name in ["JUMPIFEQS", "JUMPIFNEQS"]:
+            return ["if len(stack) < 2:", "    exit(56)", "b = stack.pop()", "a = stack.pop()",
+                    "if {}values_equal(a, b):".format("" if name == "JUMPIFEQS" else "not "), "    return {}".format(args[0])]
+        if name in ["MOVE_JUMPIFEQ", "MOVE_JUMPIFNEQ"]:
+            jump = OPCODE_IDS[name[len("MOVE_"):]]
+            return (self.generate_instruction(index, OPCODE_IDS["MOVE"], args[1:3], types[1:3])
+                    + self.generate_instruction(index, jump, [args[0]] + args[3:], [types[0]] + types[3:]))
+        if name == "CALL":
+            # RETURN continues after the CALL, which starts a block
+            return ["self.push_call({})".format(index), "return {}".format(args[0])]
+        if name in ["MOVE", "NOT", "STRLEN"]:
+            expected = {"MOVE": None, "NOT": BOOL, "STRLEN": STRING}[name]
+            lines = self.load_symbol(args[1], types[1], "a") + self.check_symbols(args[1:], types[1:], ["a"], [expected])
+            if name == "MOVE":
+                lines += self.copy_buffer(types[1])
+            expression = {"MOVE": "a", "NOT": "FALSE if a[1] else TRUE", "STRLEN": "(INT, len(a[1]))"}[name]
+            return lines + self.store_variable(args[0], expression)
+        if name in ["WRITE", "PUSHS"]:
+            lines = self.load_symbol(args[0], types[0], "a") + self.check_symbols(args, types, ["a"], [None])
+            if name == "WRITE":
+                return lines + ["write(to_output(a))"]
+            return lines + self.copy_buffer(types[0]) + ["stack.append(a)"]
+        if name == "POPS":
+            return ["if not stack:", "    exit(56)"] + self.store_variable(args[0], "stack.pop()")
+        if name in ["ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS"]:
+            # the second operand is popped and the result replaces the first one on top of the stack
+            lines = ["if len(stack) < 2:", "    exit(56)", "b = stack.pop()", "a = stack[-1]"]
+            if name in ["ADDS", "SUBS", "MULS", "IDIVS"]:
+                lines += ["if a[0] is not INT or b[0] is not INT:", "    exit(53)"]
+                if name == "IDIVS":
+                    lines += ["if b[1] == 0:", "    exit(57)"]
+                operator = {"ADDS": "+", "SUBS": "-", "MULS": "*", "IDIVS": "//"}[name]
+                return lines + ["stack[-1] = (INT, a[1] {} b[1])".format(operator)]
+            if name == "EQS":
+                return lines + ["stack[-1] = TRUE if values_equal(a, b) else FALSE"]
+            lines += ["if a[0] is not b[0] or a[0] is NIL:", "    exit(53)"]
+            return lines + ["stack[-1] = TRUE if a[1] {} b[1] else FALSE".format("<" if name == "LTS" else ">")]
+        if name == "LABEL":
+            return []
+        if name == "JUMP":
+            return ["return {}".format(args[0])]
+        # the handler reads and changes the index of the instruction through self.count
+        lines = ["self.count = {}".format(index),
+                 "handlers[{0}](program[{1}][1], program[{1}][2])".format(opcode, index)]
+        if name == "RETURN":
+            lines.append("return self.count + 1")
+        return lines
+# Execution backends selectable with --backend
+BACKENDS = {"interpret": Interpret, "closures": ClosureInterpret, "python": PythonInterpret}
+# Function to write the counters to the file given by --stats, one "name: count" line per counter
+def write_stats(path, counters):
+    try:
+        with open(path, "w") as stats:
+            stats.writelines("{}: {}\n".format(name, count) for name, count in counters.items())
+    except OSError:
+        exit(12)
 if __name__ == "__main__":
     # create an instance of the Args class and parse the command line arguments
     args = Args()
     args.execute_program_params()
-    # create an instance of the ProgramXMLReader class and read the XML file
-    XML = ProgramXMLReader(args.soursefile)
-    XML.execute_program
-    # create instances of the Instructions and Interpret classes
-    instr = Instructions(XML._root)
-    program = Interpret(instr.instr_dict, instr.label_dict, args.inputfile)
+    # a program compiled to bytecode is read without any XML parsing
+    if args.soursefile is not sys.stdin and Bytecode.is_bytecode(args.soursefile):
+        loaded = Bytecode.read(args.soursefile)
+    else:
+        # a program read from a file may already be in the cache, standard input is always parsed
+        cache = None
+        loaded = None
+        if args.cacheDir and args.soursefile is not sys.stdin:
+            cache = ProgramCache(args.cacheDir)
+            key = cache.key(args.soursefile)
+            loaded = cache.load(key)
+        if loaded is None:
+            # create an instance of the ProgramXMLReader class and stream the XML file into the Instructions builder
+            instr = Instructions()
+            XML = ProgramXMLReader(args.soursefile)
+            XML.execute_program(instr)
+            loaded = (instr.program, instr.global_names, instr.orders)
+            if cache is not None:
+                cache.store(key, *loaded)
+    # the optimization passes rewrite the loaded program, the cache always holds the program as it was loaded
+    counters = {}
+    dead_code = []
+    if args.optimize:
+        for optimizer_class in [ConstantFolder, DeadCodeEliminator, TypeInference, PeepholeOptimizer]:
+            optimizer = optimizer_class(loaded[0], loaded[2])
+            loaded = (optimizer.run(), loaded[1], optimizer.orders)
+            counters.update((optimizer.NAME + " " + rule, count) for rule, count in optimizer.counters.items())
+            if optimizer_class is DeadCodeEliminator:
+                dead_code = optimizer.removed
+    if args.deadCodeReportFile:
+        try:
+            with open(args.deadCodeReportFile, "w") as report:
+                report.writelines(line + "\n" for line in dead_code)
+        except OSError:
+            exit(12)
+    # in the compile mode the program is only written as bytecode
+    if args.compileFile:
+        if args.statsOutputFile:
+            write_stats(args.statsOutputFile, counters)
+        try:
+            Bytecode.write(args.compileFile, *loaded)
+        except OSError:
+            exit(12)
+        exit(0)
+    # the Python source of the program is only written for inspection
+    if args.dumpPythonFile:
+        if args.statsOutputFile:
+            write_stats(args.statsOutputFile, counters)
+        generator = PythonInterpret.__new__(PythonInterpret)
+        generator.program = loaded[0]
+        try:
+            with open(args.dumpPythonFile, "w") as output:
+                output.write(generator.generate_source())
+        except OSError:
+            exit(12)
+        exit(0)
+    # create an instance of the Interpret class of the selected backend and run the program,
+    # the statistics are written also when the program ends with EXIT or an error
+    program = BACKENDS[args.backend](loaded[0], loaded[1], args.inputfile, args.maxCallDepth)
+    try:
+        program.interpret()
+    finally:
+        if args.statsOutputFile:
+            counters["call-stack peak-depth"] = program.peak_call_depth
+            write_stats(args.statsOutputFile, counters)
@@ -0,0 +1,148 @@
+# Helpers shared by the tests, they run interpret.py as a separate process like a user does
+# and build IPPcode23 XML programs from lists of (opcode, [(type, text), ...]) instructions
+import os
+import random
+import subprocess
+import sys
+from xml.sax.saxutils import escape
+
+INTERPRETER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interpret.py")
+# Input read by the generated programs, one line for each READ type and one that is not a valid int
+PROGRAM_INPUT = "5\ntrue\nhello\\032x\n-3\n"
+# Limit of nested CALLs for the generated programs, which may recurse forever
+MAX_CALL_DEPTH = "--max-call-depth=1000"
+
+# Function to run the interpreter with the arguments, returns (exit code, stdout, stderr) or None on timeout
+def run_interpreter(arguments, stdin=b"", timeout=10):
+    try:
+        result = subprocess.run([sys.executable, INTERPRETER] + arguments, input=stdin, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    return result.returncode, result.stdout, result.stderr
+
+# Function to return the XML of a program made of (opcode, arguments) pairs, orders holds the order
+# attribute of every instruction, by default they are numbered from 1
+def program_xml(instructions, orders=None):
+    orders = orders or range(1, len(instructions) + 1)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode23">']
+    for order, (opcode, arguments) in zip(orders, instructions):
+        text = "".join('<arg{0} type="{1}">{2}</arg{0}>'.format(i + 1, type, escape(value)) for i, (type, value) in enumerate(arguments))
+        lines.append('<instruction order="{}" opcode="{}">{}</instruction>'.format(order, opcode, text))
+    lines.append("</program>")
+    return "\n".join(lines) + "\n"
+
+# Function to write a program to a file in the directory and return its path
+def write_program(directory, name, instructions, orders=None):
+    path = os.path.join(directory, name)
+    with open(path, "w") as source:
+        source.write(program_xml(instructions, orders))
+    return path
+
+# Generator of random programs, most operands have the type their instruction expects, so the programs
+# get past the first instructions, the rest are anything, so the error paths are taken too
+class RandomProgram:
+    VARIABLES = ["GF@x", "GF@y", "GF@z", "LF@a", "TF@b"]
+    INT_VARIABLES = ["GF@x", "GF@z", "LF@a"]
+    STRING_VARIABLES = ["GF@y", "TF@b"]
+    STRINGS = ["", "ab", "x\\032y", "&lt;q"]
+    LABELS = ["l0", "l1", "l2"]
+    OPCODES = ["MOVE", "ADD", "SUB", "MUL", "IDIV", "LT", "GT", "EQ", "AND", "OR", "NOT", "CONCAT", "STRLEN", "GETCHAR", "SETCHAR",
+               "STRI2INT", "INT2CHAR", "WRITE", "PUSHS", "POPS", "DEFVAR", "TYPE", "JUMP", "JUMPIFEQ", "JUMPIFNEQ", "LABEL",
+               "CREATEFRAME", "PUSHFRAME", "POPFRAME", "CALL", "RETURN", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS",
+               "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS", "JUMPIFEQS", "JUMPIFNEQS", "CLEARS", "READ", "EXIT", "DPRINT"]
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+    def symbol(self):
+        if self.random.random() < 0.5:
+            return ("var", self.random.choice(self.VARIABLES))
+        return self.random.choice([("int", str(self.random.randint(-3, 5))), ("int", "0"), ("bool", self.random.choice(["true", "false"])),
+                                   ("nil", "nil"), ("string", self.random.choice(self.STRINGS))])
+    def variable(self):
+        return ("var", self.random.choice(self.VARIABLES))
+    def int_symbol(self):
+        if self.random.random() < 0.1:
+            return self.symbol()
+        return self.random.choice([("var", name) for name in self.INT_VARIABLES] + [("int", str(self.random.randint(-3, 9)))])
+    def string_symbol(self):
+        if self.random.random() < 0.1:
+            return self.symbol()
+        return self.random.choice([("var", name) for name in self.STRING_VARIABLES] + [("string", self.random.choice(self.STRINGS))])
+    def int_variable(self):
+        return ("var", self.random.choice(self.INT_VARIABLES)) if self.random.random() < 0.9 else self.variable()
+    def string_variable(self):
+        return ("var", self.random.choice(self.STRING_VARIABLES)) if self.random.random() < 0.9 else self.variable()
+    def label(self):
+        return ("label", self.random.choice(self.LABELS))
+    # Method to return one random instruction, a LABEL gets its name when the program is put together
+    def instruction(self):
+        if self.random.random() < 0.4:
+            opcode = self.random.choice(["MOVE", "ADD", "SUB", "WRITE", "CONCAT", "JUMPIFEQ", "LT"])
+        else:
+            opcode = self.random.choice(self.OPCODES)
+        if opcode in ["ADD", "SUB", "MUL", "IDIV"]:
+            return opcode, [self.int_variable(), self.int_symbol(), self.int_symbol()]
+        if opcode in ["LT", "GT", "EQ"]:
+            if self.random.random() < 0.5:
+                return opcode, [self.variable(), self.int_symbol(), self.int_symbol()]
+            return opcode, [self.variable(), self.string_symbol(), self.string_symbol()]
+        if opcode == "CONCAT":
+            return opcode, [self.string_variable(), self.string_symbol(), self.string_symbol()]
+        if opcode == "GETCHAR":
+            return opcode, [self.string_variable(), self.string_symbol(), self.int_symbol()]
+        if opcode == "STRI2INT":
+            return opcode, [self.int_variable(), self.string_symbol(), self.int_symbol()]
+        if opcode == "SETCHAR":
+            return opcode, [self.string_variable(), self.int_symbol(), self.string_symbol()]
+        if opcode == "STRLEN":
+            return opcode, [self.int_variable(), self.string_symbol()]
+        if opcode == "MOVE":
+            if self.random.random() < 0.5:
+                return opcode, [self.int_variable(), self.int_symbol()]
+            return opcode, [self.string_variable(), self.string_symbol()]
+        if opcode in ["NOT", "INT2CHAR", "TYPE"]:
+            return opcode, [self.variable(), self.symbol()]
+        if opcode in ["AND", "OR"]:
+            return opcode, [self.variable(), self.symbol(), self.symbol()]
+        if opcode in ["WRITE", "PUSHS", "DPRINT"]:
+            return opcode, [self.symbol()]
+        if opcode == "EXIT":
+            return opcode, [self.random.choice([("int", str(self.random.randint(0, 60))), self.symbol()])]
+        if opcode in ["POPS", "DEFVAR"]:
+            return opcode, [self.variable()]
+        if opcode in ["JUMP", "CALL", "JUMPIFEQS", "JUMPIFNEQS"]:
+            return opcode, [self.label()]
+        if opcode in ["JUMPIFEQ", "JUMPIFNEQ"]:
+            return opcode, [self.label(), self.symbol(), self.symbol()]
+        if opcode == "LABEL":
+            return opcode, [("label", None)]
+        if opcode == "READ":
+            return opcode, [self.variable(), ("type", self.random.choice(["int", "bool", "string"]))]
+        return opcode, []
+    # Method to return the instructions of a program with about size random instructions after a prologue
+    # that defines and assigns all variables, sequences the optimizer rewrites are generated more often
+    def instructions(self, size):
+        body = [("DEFVAR", [("var", name)]) for name in ["GF@x", "GF@y", "GF@z"]]
+        body += [("CREATEFRAME", []), ("DEFVAR", [("var", "TF@a")]), ("PUSHFRAME", []), ("CREATEFRAME", []), ("DEFVAR", [("var", "TF@b")])]
+        body += [("MOVE", [("var", "GF@x"), ("int", "1")]), ("MOVE", [("var", "GF@y"), ("string", "s")]), ("MOVE", [("var", "GF@z"), ("int", "2")]),
+                 ("MOVE", [("var", "LF@a"), ("int", "3")]), ("MOVE", [("var", "TF@b"), ("string", "abc")]),
+                 ("PUSHS", [("int", "4")]), ("PUSHS", [("int", "7")]), ("PUSHS", [("int", "2")])]
+        rest = []
+        for _ in range(size):
+            choice = self.random.random()
+            if choice < 0.1:
+                rest += [("PUSHS", [self.int_symbol()]), ("PUSHS", [self.int_symbol()]),
+                         (self.random.choice(["ADDS", "SUBS", "MULS", "IDIVS"]), []), ("POPS", [self.int_variable()])]
+            elif choice < 0.2:
+                rest += [("MOVE", [self.int_variable(), self.int_symbol()]),
+                         (self.random.choice(["JUMPIFEQ", "JUMPIFNEQ"]), [self.label(), self.int_symbol(), self.int_symbol()])]
+            elif choice < 0.25:
+                rest += [("LABEL", [("label", None)]), ("JUMP", [self.label()])]
+            else:
+                rest.append(self.instruction())
+        for name in self.LABELS:
+            rest.insert(self.random.randint(0, len(rest)), ("LABEL", [("label", name)]))
+        # labels no jump goes to get unique names
+        for index, (opcode, arguments) in enumerate(rest):
+            if opcode == "LABEL" and arguments[0][1] is None:
+                rest[index] = ("LABEL", [("label", "t{}".format(index))])
+        return body + rest
@@ -0,0 +1,88 @@
+# Tests of the bytecode reader, a damaged file has to end with one of the documented exit codes and never with
+# a Python traceback, and typed instructions are not trusted because the file does not prove their types
+# Usage: python3 -m pytest tests, IPP_TEST_FLIPS sets how many damaged files are tried (100 by default)
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+from support import MAX_CALL_DEPTH, PROGRAM_INPUT, run_interpreter, write_program
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from interpret import INT, OPCODE_IDS, STRING, Bytecode
+
+FLIPS = int(os.environ.get("IPP_TEST_FLIPS", "100"))
+# Loop over ints and strings, compiled with --optimize it holds typed instructions and superinstructions
+PROGRAM = [("DEFVAR", [("var", "GF@i")]), ("DEFVAR", [("var", "GF@s")]), ("DEFVAR", [("var", "GF@c")]),
+           ("READ", [("var", "GF@i"), ("type", "int")]), ("MOVE", [("var", "GF@s"), ("string", "")]),
+           ("LABEL", [("label", "loop")]),
+           ("CONCAT", [("var", "GF@s"), ("var", "GF@s"), ("string", "a")]),
+           ("PUSHS", [("var", "GF@i")]), ("PUSHS", [("int", "1")]), ("SUBS", []), ("POPS", [("var", "GF@i")]),
+           ("LT", [("var", "GF@c"), ("int", "0"), ("var", "GF@i")]),
+           ("JUMPIFEQ", [("label", "loop"), ("var", "GF@c"), ("bool", "true")]),
+           ("STRLEN", [("var", "GF@i"), ("var", "GF@s")]), ("WRITE", [("var", "GF@i")]), ("WRITE", [("var", "GF@s")])]
+# Exit codes a damaged program may end with: its own EXIT, a bad file, a bad instruction or a runtime error
+EXIT_CODES = set(range(50)) | {31, 32, 52, 53, 54, 55, 56, 57, 58, 99}
+
+class BytecodeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, "input.txt")
+        with open(self.input, "w") as input:
+            input.write(PROGRAM_INPUT)
+    def tearDown(self):
+        self.directory.cleanup()
+    # Method to write a program array straight to a bytecode file, so it can hold what no compiler writes
+    def write_bytecode(self, program, global_names):
+        path = os.path.join(self.directory.name, "program.ippc")
+        Bytecode.write(path, [(OPCODE_IDS[opcode], args, types) for opcode, args, types in program], global_names,
+                       list(range(1, len(program) + 1)))
+        return path
+    def test_compiled_program_runs(self):
+        source = write_program(self.directory.name, "program.xml", PROGRAM)
+        bytecode = os.path.join(self.directory.name, "program.ippc")
+        self.assertEqual(run_interpreter(["--source=" + source, "--optimize", "--compile=" + bytecode])[0], 0)
+        for arguments in [[], ["--optimize"], ["--backend=closures"], ["--optimize", "--backend=python"]]:
+            with self.subTest(arguments=arguments):
+                self.assertEqual(run_interpreter(["--source=" + bytecode, "--input=" + self.input] + arguments)[:2], (0, b"5aaaaa"))
+    def test_damaged_files_do_not_crash(self):
+        source = write_program(self.directory.name, "program.xml", PROGRAM)
+        bytecode = os.path.join(self.directory.name, "program.ippc")
+        run_interpreter(["--source=" + source, "--optimize", "--compile=" + bytecode])
+        with open(bytecode, "rb") as compiled:
+            data = compiled.read()
+        generator = random.Random(0)
+        damaged = os.path.join(self.directory.name, "damaged.ippc")
+        for flip in range(FLIPS):
+            flipped = bytearray(data)
+            for _ in range(generator.randint(1, 3)):
+                flipped[generator.randrange(len(flipped))] = generator.randrange(256)
+            with open(damaged, "wb") as output:
+                output.write(flipped)
+            arguments = generator.choice([[], ["--optimize"], ["--backend=closures"], ["--backend=python"]])
+            result = run_interpreter(["--source=" + damaged, "--input=" + self.input, MAX_CALL_DEPTH] + arguments, timeout=5)
+            # a flipped jump target may loop forever, which is not a crash
+            if result is None:
+                continue
+            with self.subTest(flip=flip, arguments=arguments):
+                self.assertNotIn(b"Traceback", result[2])
+                self.assertIn(result[0], EXIT_CODES)
+    def test_typed_instruction_over_a_read_string(self):
+        program = [("DEFVAR", [("GF", 0)], ["var"]), ("READ", [("GF", 0), STRING], ["var", "type"]),
+                   ("ADD_INT", [("GF", 0), ("GF", 0), (INT, 1)], ["var", "var", "int"]), ("WRITE", [("GF", 0)], ["var"])]
+        bytecode = self.write_bytecode(program, ["a"])
+        for arguments in [[], ["--optimize"], ["--backend=closures"], ["--backend=python"], ["--optimize", "--backend=python"]]:
+            with self.subTest(arguments=arguments):
+                self.assertEqual(run_interpreter(["--source=" + bytecode] + arguments, stdin=b"abc\n"), (53, b"", b""))
+    def test_typed_instruction_over_a_local_variable(self):
+        program = [("CREATEFRAME", [], []), ("DEFVAR", [("TF", "a")], ["var"]), ("MOVE", [("TF", "a"), (STRING, "x")], ["var", "string"]),
+                   ("PUSHFRAME", [], []), ("ADD_INT", [("LF", "a"), ("LF", "a"), (INT, 1)], ["var", "var", "int"]),
+                   ("WRITE", [("LF", "a")], ["var"])]
+        bytecode = self.write_bytecode(program, [])
+        for arguments in [[], ["--optimize"], ["--backend=closures"], ["--backend=python"], ["--optimize", "--backend=python"]]:
+            with self.subTest(arguments=arguments):
+                self.assertEqual(run_interpreter(["--source=" + bytecode] + arguments), (53, b"", b""))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# Differential tests, random programs have to give the same exit code and standard output in every backend,
+# with and without --optimize and when they are run again from bytecode compiled with --optimize
+# Usage: python3 -m pytest tests, IPP_TEST_PROGRAMS sets how many programs are generated (30 by default)
+import os
+import tempfile
+import unittest
+
+from support import MAX_CALL_DEPTH, PROGRAM_INPUT, RandomProgram, run_interpreter, write_program
+
+PROGRAMS = int(os.environ.get("IPP_TEST_PROGRAMS", "30"))
+CONFIGURATIONS = [["--backend=closures"], ["--backend=python"], ["--optimize"], ["--optimize", "--backend=closures"],
+                  ["--optimize", "--backend=python"]]
+
+class DifferentialTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, "input.txt")
+        with open(self.input, "w") as input:
+            input.write(PROGRAM_INPUT)
+    def tearDown(self):
+        self.directory.cleanup()
+    # Method to return the exit code and standard output of a run, or None if the program does not end
+    def outcome(self, arguments, timeout):
+        result = run_interpreter(arguments + ["--input=" + self.input, MAX_CALL_DEPTH], timeout=timeout)
+        if result is None:
+            return None
+        self.assertNotIn(b"Traceback", result[2], arguments)
+        return result[:2]
+    def test_backends_and_optimizer_agree(self):
+        for seed in range(PROGRAMS):
+            generator = RandomProgram(seed)
+            instructions = generator.instructions(generator.random.randint(3, 25))
+            source = write_program(self.directory.name, "program.xml", instructions)
+            # programs looping forever are left out, a terminating one ends in milliseconds
+            expected = self.outcome(["--source=" + source], timeout=2)
+            if expected is None:
+                continue
+            for configuration in CONFIGURATIONS:
+                with self.subTest(seed=seed, configuration=configuration):
+                    self.assertEqual(self.outcome(["--source=" + source] + configuration, timeout=10), expected)
+            bytecode = os.path.join(self.directory.name, "program.ippc")
+            compiled = run_interpreter(["--source=" + source, "--optimize", "--compile=" + bytecode])
+            self.assertNotIn(b"Traceback", compiled[2])
+            if compiled[0] != 0:
+                # the program did not load, which the reference run reported with the same exit code
+                self.assertEqual(compiled[0], expected[0])
+                continue
+            for backend in ["interpret", "closures", "python"]:
+                with self.subTest(seed=seed, bytecode=backend):
+                    self.assertEqual(self.outcome(["--source=" + bytecode, "--optimize", "--backend=" + backend], timeout=10), expected)
+
+if __name__ == "__main__":
+    unittest.main()
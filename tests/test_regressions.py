@@ -0,0 +1,97 @@
+# Regression tests, each program once gave a different result in some backend or with --optimize
+# Usage: python3 -m pytest tests
+import os
+import tempfile
+import unittest
+
+from support import run_interpreter, write_program
+
+CONFIGURATIONS = [[], ["--backend=closures"], ["--backend=python"], ["--optimize"], ["--optimize", "--backend=closures"],
+                  ["--optimize", "--backend=python"]]
+
+class RegressionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+    def tearDown(self):
+        self.directory.cleanup()
+    # Method to check the exit code and standard output of a program in every configuration
+    def check(self, instructions, expected, stdin=b"", arguments=(), orders=None):
+        source = write_program(self.directory.name, "program.xml", instructions, orders)
+        for configuration in CONFIGURATIONS:
+            with self.subTest(configuration=configuration):
+                result = run_interpreter(["--source=" + source] + list(arguments) + configuration, stdin=stdin)
+                self.assertNotIn(b"Traceback", result[2])
+                self.assertEqual(result[:2], expected)
+    # input with CRLF line breaks is read without the CR, from a file and from standard input
+    def test_crlf_input(self):
+        instructions = [("DEFVAR", [("var", "GF@b")]), ("DEFVAR", [("var", "GF@s")]), ("DEFVAR", [("var", "GF@i")]),
+                        ("READ", [("var", "GF@b"), ("type", "bool")]), ("READ", [("var", "GF@s"), ("type", "string")]),
+                        ("READ", [("var", "GF@i"), ("type", "int")]),
+                        ("WRITE", [("var", "GF@b")]), ("WRITE", [("var", "GF@s")]), ("STRLEN", [("var", "GF@i"), ("var", "GF@s")]),
+                        ("WRITE", [("var", "GF@i")])]
+        self.check(instructions, (0, b"trueab2"), stdin=b"true\r\nab\r\n12\r\n")
+        input = os.path.join(self.directory.name, "input.txt")
+        with open(input, "wb") as output:
+            output.write(b"true\r\nab\r\n12\r\n")
+        self.check(instructions, (0, b"trueab2"), arguments=["--input=" + input])
+    # the MOVE fused into MOVE_JUMPIFEQ writes its variable, which the folder and type inference have to see
+    def test_superinstruction_writes(self):
+        self.check([("DEFVAR", [("var", "GF@x")]), ("DEFVAR", [("var", "GF@y")]), ("READ", [("var", "GF@y"), ("type", "int")]),
+                    ("JUMP", [("label", "A")]), ("LABEL", [("label", "A")]), ("MOVE", [("var", "GF@x"), ("int", "1")]),
+                    ("MOVE", [("var", "GF@x"), ("var", "GF@y")]), ("JUMPIFEQ", [("label", "L"), ("var", "GF@x"), ("int", "5")]),
+                    ("WRITE", [("string", "no")]), ("LABEL", [("label", "L")]), ("PUSHS", [("int", "2")]), ("PUSHS", [("var", "GF@x")]),
+                    ("ADDS", []), ("POPS", [("var", "GF@x")]), ("WRITE", [("var", "GF@x")])], (0, b"7"), stdin=b"5\n")
+    # a variable known to be an int in one block is a string after a later MOVE from a READ string
+    def test_type_changed_by_move(self):
+        self.check([("DEFVAR", [("var", "GF@x")]), ("DEFVAR", [("var", "GF@s")]), ("DEFVAR", [("var", "GF@y")]),
+                    ("READ", [("var", "GF@s"), ("type", "string")]), ("MOVE", [("var", "GF@x"), ("int", "1")]),
+                    ("MOVE", [("var", "GF@x"), ("var", "GF@s")]), ("JUMPIFEQ", [("label", "L"), ("var", "GF@s"), ("string", "zz")]),
+                    ("LABEL", [("label", "L")]), ("ADD", [("var", "GF@y"), ("var", "GF@x"), ("int", "1")]),
+                    ("WRITE", [("var", "GF@y")])], (53, b""), stdin=b"abc\n")
+    # a constant propagated into the block after a jump is overwritten by the ADD it feeds
+    def test_folded_variable_written_again(self):
+        self.check([("DEFVAR", [("var", "GF@x")]), ("DEFVAR", [("var", "GF@y")]), ("MOVE", [("var", "GF@y"), ("int", "5")]),
+                    ("JUMP", [("label", "L")]), ("LABEL", [("label", "L")]), ("MOVE", [("var", "GF@x"), ("int", "1")]),
+                    ("ADD", [("var", "GF@x"), ("var", "GF@x"), ("var", "GF@y")]), ("WRITE", [("var", "GF@x")])], (0, b"6"))
+    # an error found while folding is left for the run, which writes what comes before it
+    def test_folded_error_after_output(self):
+        self.check([("DEFVAR", [("var", "GF@x")]), ("WRITE", [("string", "a")]),
+                    ("IDIV", [("var", "GF@x"), ("int", "1"), ("int", "0")])], (57, b"a"))
+        # folding the failing IDIV must not close standard input before the READ runs
+        self.check([("DEFVAR", [("var", "GF@x")]), ("READ", [("var", "GF@x"), ("type", "string")]), ("WRITE", [("var", "GF@x")]),
+                    ("IDIV", [("var", "GF@x"), ("int", "1"), ("int", "0")])], (57, b"in"), stdin=b"in\n")
+    # an error in an instruction of a program read from standard input is reported after the rest of the document
+    def test_invalid_instruction_on_standard_input(self):
+        instructions = [("MOVE", [("var", "GF@a")])] + [("CREATEFRAME", [])] * 3000
+        input = os.path.join(self.directory.name, "input.txt")
+        with open(input, "w") as output:
+            output.write("")
+        with open(write_program(self.directory.name, "program.xml", instructions), "rb") as source:
+            self.assertEqual(run_interpreter(["--input=" + input], stdin=source.read()), (32, b"", b""))
+    # label and type operands where a symbol is read never reach the handlers, which check for a SETCHAR buffer
+    # in the value of every symbol they copy
+    def test_label_and_type_operands(self):
+        prologue = [("DEFVAR", [("var", "GF@a")]), ("MOVE", [("var", "GF@a"), ("string", "ab")]),
+                    ("SETCHAR", [("var", "GF@a"), ("int", "0"), ("string", "x")]), ("LABEL", [("label", "x")])]
+        for instruction in [("MOVE", [("var", "GF@a"), ("label", "x")]), ("MOVE", [("var", "GF@a"), ("type", "int")]),
+                            ("MOVE", [("int", "1"), ("int", "1")]), ("MOVE", [("label", "x"), ("string", "q")]),
+                            ("PUSHS", [("label", "x")]), ("PUSHS", [("type", "string")]), ("WRITE", [("label", "x")]),
+                            ("SETCHAR", [("var", "GF@a"), ("int", "0"), ("label", "x")]),
+                            ("CONCAT", [("var", "GF@a"), ("var", "GF@a"), ("type", "int")]),
+                            ("JUMPIFEQ", [("label", "x"), ("var", "GF@a"), ("label", "x")]),
+                            ("READ", [("var", "GF@a"), ("int", "1")]), ("JUMP", [("var", "GF@a")])]:
+            with self.subTest(instruction=instruction):
+                self.check(prologue + [instruction, ("WRITE", [("var", "GF@a")])], (53, b""))
+    # removed blocks are reported by the order numbers of the source, not by positions in the program array
+    def test_dead_code_report_orders(self):
+        source = write_program(self.directory.name, "program.xml",
+                               [("WRITE", [("string", "dead")]), ("JUMPIFEQ", [("label", "E"), ("int", "1"), ("int", "2")]),
+                                ("WRITE", [("string", "x")]), ("JUMP", [("label", "E")]), ("WRITE", [("string", "dead")]),
+                                ("EXIT", [("int", "3")]), ("LABEL", [("label", "E")])], orders=[70, 10, 30, 40, 50, 60, 100])
+        report = os.path.join(self.directory.name, "report.txt")
+        self.assertEqual(run_interpreter(["--source=" + source, "--optimize", "--dead-code-report=" + report])[:2], (0, b"x"))
+        with open(report) as lines:
+            self.assertEqual(lines.read(), "order 50: 2 instructions\norder 70: 1 instructions\n")
+
+if __name__ == "__main__":
+    unittest.main()